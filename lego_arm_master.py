@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import atexit
+import functools
 import os
 import time
-import uuid
+import gzip
+import hashlib
+import hmac
+import heapq
 import json
+import math
 import threading
 import queue
+import secrets
+import select
 import socket
+from collections import OrderedDict
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from socketserver import ThreadingMixIn
 from urllib.parse import urlparse
@@ -27,10 +36,76 @@ logger = logging.getLogger("lego_arm")
 logger.setLevel(logging.INFO)
 _log_path = os.path.join(os.path.dirname(__file__), "lego_arm_master.log")
 _formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s:%(lineno)d %(message)s")
+
+
+# Buffered log records reach the file at least this often; warnings and
+# errors are written through immediately.
+LOG_FLUSH_INTERVAL_S = 1.0
+
+
+class _LogFileHandler(RotatingFileHandler):
+    """``RotatingFileHandler`` tuned for the Pi's SD card.
+
+    The stock handler flushes after every record and, before each one, stats
+    the log path twice and formats the record an extra time to measure it.
+    Here INFO records collect in a 64 KiB buffer that ``_log_flush_loop``
+    drains, the regular-file check is done once, and the file size is kept
+    as a running count (asking the stream with ``tell()`` would flush the
+    buffer), so a rollover may happen one record late.
+    """
+
+    def __init__(self, filename, *args, **kwargs):
+        self._size = 0
+        super().__init__(filename, *args, **kwargs)
+        # Never roll over anything other than regular files (bpo-45401).
+        self._rotatable = not os.path.exists(self.baseFilename) or os.path.isfile(self.baseFilename)
+
+    def _open(self):
+        stream = open(self.baseFilename, self.mode, buffering=64 * 1024, encoding=self.encoding, errors=self.errors)
+        self._size = os.fstat(stream.fileno()).st_size
+        return stream
+
+    def doRollover(self):
+        super().doRollover()
+        if self.stream is None:  # delay was set; the next emit reopens
+            self._size = 0
+
+    def shouldRollover(self, record):
+        if not self._rotatable or self.maxBytes <= 0:
+            return False
+        return self._size >= self.maxBytes
+
+    def emit(self, record):
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            msg = self.format(record) + self.terminator
+            self.stream.write(msg)
+            self._size += len(msg)
+            if record.levelno >= logging.WARNING:
+                # The watchdog calls os._exit right after logging an error.
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+def _log_flush_loop(handler: logging.Handler, interval_s: float) -> None:
+    while True:
+        time.sleep(interval_s)
+        handler.flush()
+
+
 try:  # pragma: no cover - filesystem may be read-only
-    _handler = RotatingFileHandler(_log_path, maxBytes=1_000_000, backupCount=3)
+    _handler = _LogFileHandler(_log_path, maxBytes=1_000_000, backupCount=3)
     _handler.setFormatter(_formatter)
     logger.addHandler(_handler)
+    threading.Thread(
+        target=_log_flush_loop, args=(_handler, LOG_FLUSH_INTERVAL_S), name="log-flush", daemon=True
+    ).start()
 except Exception as e:  # pragma: no cover - logging setup failure
     _fallback = logging.StreamHandler()
     _fallback.setFormatter(_formatter)
@@ -45,6 +120,22 @@ except Exception:  # pragma: no cover - device might not exist
     list_devices = None  # type: ignore
     ecodes = None  # type: ignore
 
+# Optional fast JSON codec (`orjson`); the stdlib module is used otherwise.
+try:  # pragma: no cover - optional dependency
+    import orjson  # type: ignore
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    _loads = orjson.loads
+except Exception:  # pragma: no cover - orjson not installed
+    orjson = None  # type: ignore
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    _loads = json.loads
+
 # ---------------------------
 # Hardware abstraction layer
 # ---------------------------
@@ -82,16 +173,90 @@ except Exception:
 # Controller
 # ---------------------------
 
+# Built-in named poses (absolute degrees). Frozen at import so ``goto_pose``
+# and ``pickplace`` do not rebuild them per call.
+_POSES: Dict[str, Dict[str, float]] = {
+    "home": {"A": 0, "B": 0, "C": 0, "D": 0},
+    "pick_left": {"D": -60, "B": -20, "C": 30, "A": 20},
+    "pick_right": {"D": 60, "B": -20, "C": 30, "A": 20},
+    "place_left": {"D": -60, "B": 10, "C": -10, "A": -5},
+    "place_right": {"D": 60, "B": 10, "C": -10, "A": -5},
+}
+
+# Default per-joint tolerance (degrees) for ``verify_at``.
+_VERIFY_TOL: Dict[str, float] = {"A": 2.0, "B": 3.0, "C": 3.0, "D": 3.0}
+
+# Pose sequence per (location, action) for ``pickplace``.
+_SEQ_POSE: Dict[tuple[str, str], tuple[str, ...]] = {
+    ("left", "pick"): ("pick_left", "home"),
+    ("left", "place"): ("place_left", "home"),
+    ("right", "pick"): ("pick_right", "home"),
+    ("right", "place"): ("place_right", "home"),
+    ("center", "pick"): ("home",),
+    ("center", "place"): ("home",),
+}
+
+_POINT_RE = re.compile(r"\s*([A-Za-z_ ]+?)(?:\s*([+-])\s*([0-9]+(?:\.[0-9]+)?))?\s*")
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_point_expr(value: str) -> tuple[str, float]:
+    """Split ``"closed - 10"`` into ``("closed", -10.0)``.
+
+    Only the parse is cached; callers look the base point up each time so a
+    recalibration takes effect immediately.
+    """
+    m = _POINT_RE.fullmatch(value)
+    if not m:
+        raise ValueError(f"Invalid point expression '{value}'")
+    base = m.group(1).strip().lower().replace(" ", "_")
+    offset = float(m.group(3)) if m.group(3) else 0.0
+    if m.group(2) == '-':
+        offset = -offset
+    return base, offset
+
+
+# Named points whose extremes bound each joint once calibration is finalized.
+_LIMIT_POINTS: Dict[str, tuple[str, ...]] = {
+    "A": ("open", "closed"),
+    "B": ("min", "max"),
+    "C": ("min", "max"),
+    "D": ("assembly", "neutral", "quality"),
+}
+
+
+# Cap on how far queued streaming (gamepad) input may carry a joint once the
+# arm frees up, so holding a stick during a long move cannot cause a jump.
+PENDING_DELTA_MAX_DEG = 15.0
+
+# Gamepad axis events are coalesced over this window before a step is sent.
+GAMEPAD_WINDOW_S = 0.02
+
+# After a move times out and its motors are stopped, how long to wait for the
+# joint driver threads to return before giving up on them.
+STOP_DRAIN_TIMEOUT_S = 3.0
+
+
+# Calibration saves are coalesced by a background writer; see
+# ``ArmController.save_calibration``.
+CALIB_WRITE_DELAY_S = 0.5
+
+
 class ArmController:
-    def __init__(self):
+    def __init__(self, calib_path: Optional[str] = None):
         self.motors: Dict[str, Motor] = {
             "A": Motor("A"),  # gripper
             "B": Motor("B"),  # wrist
             "C": Motor("C"),  # elbow
             "D": Motor("D"),  # rotation
         }
+        # The motor set is fixed after construction; share one immutable copy.
+        self._motor_names: tuple[str, ...] = tuple(self.motors)
+        # joint -> (motor, bound position getter); see ``_position_getter``.
+        self._pos_getters: Dict[str, tuple[Motor, object]] = {}
         self.current_abs: Dict[str, float] = {k: 0.0 for k in self.motors}
-        self._calib_path = os.path.join(os.path.dirname(__file__), "arm_calibration.json")
+        # Tests pass their own path so they never touch the arm's real file.
+        self._calib_path = calib_path or os.path.join(os.path.dirname(__file__), "arm_calibration.json")
         # Degrees the motor must rotate for one full joint rotation. Defaults to
         # 360° but can be tuned per motor via the admin UI.
         self.rotation_deg: Dict[str, float] = {j: 360.0 for j in self.motors}
@@ -114,12 +279,26 @@ class ArmController:
             "finalize_corrections": {},
             "timeout": False,
         }
+        self._state_version = 0
+        self._state_cache: Optional[tuple[int, bytes]] = None
+        self._calib_pending: Optional[dict] = None
+        self._calib_pending_lock = threading.Lock()
+        self._calib_write_lock = threading.Lock()
+        # (path, bytes) of the last successful write; see flush_calibration.
+        self._calib_written: Optional[tuple[str, bytes]] = None
+        self._calib_dirty = threading.Event()
+        threading.Thread(target=self._calibration_writer, name="calibration-writer", daemon=True).start()
+        atexit.register(self.flush_calibration)
         self._health_lock = threading.Lock()
         self._last_motor_ok = time.time()
         self._last_motor_error: Optional[str] = None
         try:
-            with open(self._calib_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(self._calib_path, "rb") as f:
+                raw = f.read()
+            data = _loads(raw)
+            # The save at the end of __init__ usually re-encodes exactly these
+            # bytes; remembering them lets flush_calibration skip that write.
+            self._calib_written = (self._calib_path, raw)
             self.rotation_deg.update({j: float(data.get("rotation", {}).get(j, 360.0)) for j in self.motors})
             scale = data.get("speed_scale", {})
             for j in self.motors:
@@ -162,89 +341,156 @@ class ArmController:
         self.calibrated: bool = False
         self.lock = threading.Lock()
         self.stop_event = threading.Event()
-        self._busy_owner: Optional[int] = None
-        self._busy_count = 0
+        # Busy gate: one command (and the calls it nests, e.g. pickplace ->
+        # goto_pose -> move) at a time. Separate from ``self.lock`` so a BUSY
+        # answer never waits behind a state update.
+        self._busy = threading.RLock()
+        # Counts moves that got past planning and reached the motors, so a
+        # caller can tell a rejected command from one that moved the arm.
+        self.moves_started = 0
+        # Long-lived per-joint driver threads, started on first use; see
+        # ``_joint_queue``.
+        self._joint_queues: Dict[str, "queue.SimpleQueue[Optional[tuple]]"] = {}
+        # Streaming deltas waiting for the arm; see ``move_nowait``.
+        self._pending_deltas: Dict[str, float] = {}
+        self._pending_lock = threading.Lock()
 
     def clamp(self, joint: str, value: float) -> float:
+        # NaN compares false against both limits and would slip through
+        # unclamped, so non-finite targets are refused outright.
+        if not math.isfinite(value):
+            raise ValueError(f"Non-finite target for joint '{joint}'")
         limits = self.limits.get(joint)
         if limits is None:
             return value
         lo, hi = limits
-        return max(lo, min(hi, value))
+        # Plain comparisons avoid two builtin calls on the per-joint path.
+        if value < lo:
+            return lo
+        if value > hi:
+            return hi
+        return value
 
     def stop_all(self):
         self.stop_event.set()
-        for m in self.motors.values():
-            try:
-                m.stop()
-            except Exception:
-                pass
+        # Each Build HAT stop is its own serial round trip; issue them side by
+        # side so the last motor is not held up behind the others. The joint
+        # driver threads cannot be used here since they may be blocked in a
+        # motion call.
+        motors = list(self.motors.values())
+        threads = [threading.Thread(target=self._stop_motor, args=(m,), daemon=True) for m in motors[1:]]
+        for t in threads:
+            t.start()
+        if motors:
+            self._stop_motor(motors[0])
+        for t in threads:
+            t.join()
+
+    @staticmethod
+    def _stop_motor(motor: Motor) -> None:
+        try:
+            motor.stop()
+        except Exception:
+            pass
 
     def _acquire_busy(self) -> bool:
-        tid = threading.get_ident()
-        with self.lock:
-            if self._busy_owner not in (None, tid):
-                return False
-            self._busy_owner = tid
-            self._busy_count += 1
-            return True
+        return self._busy.acquire(blocking=False)
 
     def _release_busy(self) -> None:
-        tid = threading.get_ident()
-        with self.lock:
-            if self._busy_owner == tid:
-                self._busy_count -= 1
-                if self._busy_count <= 0:
-                    self._busy_owner = None
-                    self._busy_count = 0
+        try:
+            self._busy.release()
+        except RuntimeError:
+            # Not held by this thread; nothing to release.
+            pass
 
     def coast(self, motors: Optional[list[str]] = None, enable: bool = True):
-        targets = motors or list(self.motors.keys())
-        with self.lock:
-            for j in targets:
-                m = self.motors.get(j)
-                if not m:
-                    continue
-                action = "coast" if enable else "brake"
-                if hasattr(m, "set_default_stop_action"):
-                    try:
-                        m.set_default_stop_action(action)
-                    except Exception:
-                        pass
-                if enable and hasattr(m, "float"):
-                    try:
-                        m.float()
+        if not self._acquire_busy():
+            raise RuntimeError("BUSY")
+        try:
+            targets = motors or list(self._motor_names)
+            with self.lock:
+                for j in targets:
+                    m = self.motors.get(j)
+                    if not m:
                         continue
-                    except Exception:
-                        pass
-                try:
-                    m.stop()
-                except Exception:
-                    pass
-                if not enable:
-                    getter = getattr(m, "get_degrees", None) or getattr(m, "get_position", None)
-                    if getter:
+                    action = "coast" if enable else "brake"
+                    if hasattr(m, "set_default_stop_action"):
+                        try:
+                            m.set_default_stop_action(action)
+                        except Exception:
+                            pass
+                    if enable and hasattr(m, "float"):
                         try:
-                            self.current_abs[j] = float(getter())
-                            self._note_motor_ok()
+                            m.float()
+                            continue
                         except Exception:
                             pass
-        return {"motors": targets, "coast": enable}
+                    try:
+                        m.stop()
+                    except Exception:
+                        pass
+                    if not enable:
+                        value = self._read_degrees(j)
+                        if value is not None:
+                            self.current_abs[j] = value
+            if not enable:
+                self._state_version += 1
+            return {"motors": targets, "coast": enable}
+        finally:
+            self._release_busy()
 
     def save_calibration(self) -> None:
-        try:
-            temp_path = f"{self._calib_path}.tmp"
-            with open(temp_path, "w", encoding="utf-8") as f:
-                json.dump({
-                    "rotation": self.rotation_deg,
-                    "speed_scale": self.speed_deg_per_sec,
-                    "points": self.points,
-                }, f)
-                f.flush()
-                os.fsync(f.fileno())
-            os.replace(temp_path, self._calib_path)
-        except Exception:
-            pass
+        """Hand the current calibration to the background writer.
+
+        The snapshot is copied here, usually under ``self.lock``, so the writer
+        never serialises dicts another thread is mutating. Saves that arrive
+        within ``CALIB_WRITE_DELAY_S`` of each other reach disk as one write.
+        """
+        snapshot = {
+            "rotation": dict(self.rotation_deg),
+            "speed_scale": dict(self.speed_deg_per_sec),
+            "points": {j: dict(pts) for j, pts in self.points.items()},
+        }
+        with self._calib_pending_lock:
+            self._calib_pending = snapshot
+        self._calib_dirty.set()
+        # Every calibration change ends up here, so this also invalidates
+        # ``state_body``; position-only updates (``move``, ``coast``,
+        # ``recover_to_home``) bump the version themselves.
+        self._state_version += 1
+
+    def flush_calibration(self) -> None:
+        """Write any pending calibration snapshot to disk now.
+
+        Most saves follow a move that changed no calibration data, so a
+        snapshot identical to the last one written is not written again.
+        """
+        with self._calib_write_lock:
+            with self._calib_pending_lock:
+                snapshot, self._calib_pending = self._calib_pending, None
+            if snapshot is None:
+                return
+            data = _dumps(snapshot)
+            written = (self._calib_path, data)
+            if written == self._calib_written:
+                return
+            try:
+                temp_path = f"{self._calib_path}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self._calib_path)
+                self._calib_written = written
+            except Exception:
+                pass
+
+    def _calibration_writer(self) -> None:
+        while True:
+            self._calib_dirty.wait()
+            time.sleep(CALIB_WRITE_DELAY_S)
+            self._calib_dirty.clear()
+            self.flush_calibration()
 
     def _note_motor_ok(self) -> None:
         with self._health_lock:
@@ -261,14 +507,38 @@ class ArmController:
                 "last_error": self._last_motor_error,
             }
 
+    def _position_getter(self, joint: str):
+        """Return the motor's bound position getter, resolved once per motor.
+
+        Keyed on the motor object as well, so swapping ``self.motors[joint]``
+        (as the tests do) picks up the new motor's getter.
+        """
+        motor = self.motors[joint]
+        cached = self._pos_getters.get(joint)
+        if cached is None or cached[0] is not motor:
+            getter = getattr(motor, "get_degrees", None) or getattr(motor, "get_position", None)
+            cached = self._pos_getters[joint] = (motor, getter)
+        return cached[1]
+
+    def _read_degrees(self, joint: str) -> Optional[float]:
+        getter = self._position_getter(joint)
+        if not getter:
+            return None
+        try:
+            value = float(getter())
+        except Exception:
+            return None
+        self._note_motor_ok()
+        return value
+
     def poll_motor_health(self) -> bool:
         if USE_FAKE:
             self._note_motor_ok()
             return True
         ok = True
         last_error = None
-        for joint, motor in self.motors.items():
-            getter = getattr(motor, "get_degrees", None) or getattr(motor, "get_position", None)
+        for joint in self.motors:
+            getter = self._position_getter(joint)
             if not getter:
                 last_error = f"Motor {joint} missing position getter"
                 ok = False
@@ -288,20 +558,25 @@ class ArmController:
         return ok
 
     def set_rotation(self, values: Dict[str, float]) -> dict:
-        with self.lock:
-            for j, v in values.items():
-                if j in self.motors:
-                    try:
-                        val = float(v)
-                    except (TypeError, ValueError):
-                        continue
-                    if val <= 0:
-                        continue
-                    self.rotation_deg[j] = val
-            # Rotation calibration stays mechanical for the gripper.
-            self.rotation_deg["A"] = 360.0
-            self.save_calibration()
-            return {"rotation": self.rotation_deg.copy()}
+        if not self._acquire_busy():
+            raise RuntimeError("BUSY")
+        try:
+            with self.lock:
+                for j, v in values.items():
+                    if j in self.motors:
+                        try:
+                            val = float(v)
+                        except (TypeError, ValueError):
+                            continue
+                        if val <= 0:
+                            continue
+                        self.rotation_deg[j] = val
+                # Rotation calibration stays mechanical for the gripper.
+                self.rotation_deg["A"] = 360.0
+                self.save_calibration()
+                return {"rotation": self.rotation_deg.copy()}
+        finally:
+            self._release_busy()
 
     def resolve_point(self, joint: str, value: str) -> float:
         """Return absolute degrees for a named point expression.
@@ -310,13 +585,7 @@ class ArmController:
         ``"closed - 10"``.  Names are case-insensitive and may contain spaces
         which will be normalized to underscores.
         """
-        m = re.fullmatch(r"\s*([A-Za-z_ ]+?)(?:\s*([+-])\s*([0-9]+(?:\.[0-9]+)?))?\s*", value)
-        if not m:
-            raise ValueError(f"Invalid point expression '{value}'")
-        base = m.group(1).strip().lower().replace(" ", "_")
-        offset = float(m.group(3)) if m.group(3) else 0.0
-        if m.group(2) == '-':
-            offset = -offset
+        base, offset = _parse_point_expr(value)
         base_val = self.points.get(joint, {}).get(base)
         if base_val is None:
             raise ValueError(f"Unknown point '{base}' for joint {joint}")
@@ -362,7 +631,9 @@ class ArmController:
         if not self._acquire_busy():
             raise RuntimeError("BUSY")
 
-        start_time = time.time()
+        # Timing uses the monotonic clock so NTP steps cannot fire or mask a
+        # timeout; ``deadline`` is computed once and compared directly.
+        start_time = time.monotonic()
         timeout_triggered = False
 
         try:
@@ -375,14 +646,20 @@ class ArmController:
                 converted: Dict[str, float] = {}
                 targets: Dict[str, float] = {}
                 plan: Dict[str, dict] = {}
+                # Joints that actually need to move, collected while planning.
+                active: list[tuple[str, dict]] = []
 
+                motors = self.motors
+                current_abs = self.current_abs
+                rotation_deg = self.rotation_deg
+                clamp = self.clamp
                 for joint, raw in joints.items():
-                    if joint not in self.motors:
+                    motor = motors.get(joint)
+                    if motor is None:
                         raise ValueError(f"Unknown joint '{joint}'")
 
-                    motor = self.motors[joint]
-                    current = self.current_abs[joint]
-                    rot_per = self.rotation_deg.get(joint, 360.0) or 360.0
+                    current = current_abs[joint]
+                    rot_per = rotation_deg.get(joint, 360.0) or 360.0
 
                     if isinstance(raw, str):
                         target = self.resolve_point(joint, raw)
@@ -404,7 +681,7 @@ class ArmController:
                             else:
                                 target = value
 
-                    target = self.clamp(joint, target)
+                    target = clamp(joint, target)
                     delta_deg = target - current
                     converted[joint] = delta_deg
                     targets[joint] = target
@@ -422,21 +699,20 @@ class ArmController:
                         entry["rot_per"] = rot_per
                         entry["delta_rot"] = delta_deg / rot_per if rot_per else 0.0
                     plan[joint] = entry
-
-                expected_per_joint: Dict[str, float] = {}
-                for joint, delta in converted.items():
-                    if abs(delta) < 1e-6:
-                        expected_per_joint[joint] = 0.0
-                        continue
-                    deg_per_s = max(
-                        1.0,
-                        abs(self.speed_deg_per_sec.get(joint, 6.0) * max(speed_mag, 1)),
-                    )
-                    expected_per_joint[joint] = abs(delta) / deg_per_s
+                    if abs(delta_deg) >= 1e-6:
+                        active.append((joint, entry))
 
                 deadline = None
                 if timeout_val is not None:
-                    total_expected = max(expected_per_joint.values() or [0.0])
+                    # Expected motion time only matters for the timeout advice.
+                    speed_deg_per_sec = self.speed_deg_per_sec
+                    total_expected = max(
+                        (
+                            abs(info["delta_deg"]) / max(1.0, abs(speed_deg_per_sec.get(joint, 6.0) * speed_mag))
+                            for joint, info in active
+                        ),
+                        default=0.0,
+                    )
                     recommended = 3.0 + 1.2 * total_expected
                     if timeout_val < recommended:
                         logger.warning(
@@ -446,95 +722,64 @@ class ArmController:
                             total_expected,
                         )
                     deadline = start_time + timeout_val
-
-                for joint, info in plan.items():
-                    delta = float(info["delta_deg"])
-                    if abs(delta) < 1e-6:
-                        continue
-                    run_delta = delta
-                    motor = info["motor"]  # type: ignore[assignment]
-
-                    if info.get("is_rotation"):
-                        rot_per = float(info.get("rot_per") or self.rotation_deg.get(joint, 360.0) or 360.0)
-                        requested_rot = float(info.get("delta_rot", run_delta / rot_per))
-                        run_rot = run_delta / rot_per
-                        if self.stop_event.is_set():
-                            self.stop_event.clear()
-                            raise InterruptedError("Movement interrupted")
-                        if deadline is not None and time.time() > deadline:
-                            timeout_triggered = True
-                            self.stop_event.clear()
-                            raise TimeoutError(
-                                f"Movement timed out after {timeout_val:.2f}s"
-                            )
-                        logger.info(
-                            "Moving joint %s by %.3f rotations at speed %d",
-                            joint,
-                            run_rot,
-                            speed_mag,
-                        )
-                        motor.run_for_rotations(run_rot, speed=speed_mag, blocking=True)  # type: ignore[arg-type]
-                        self._note_motor_ok()
-                        if deadline is not None and time.time() > deadline:
-                            timeout_triggered = True
-                            self.stop_event.clear()
-                            raise TimeoutError(
-                                f"Movement timed out after {timeout_val:.2f}s"
-                            )
-                    else:
-                        max_chunk = 12000.0
-                        remaining = run_delta
-                        chunks = []
-                        while abs(remaining) > max_chunk:
-                            chunk = max_chunk if remaining > 0 else -max_chunk
-                            chunks.append(chunk)
-                            remaining -= chunk
-                        chunks.append(remaining)
-                        for idx, chunk in enumerate(chunks, 1):
-                            if self.stop_event.is_set():
-                                self.stop_event.clear()
-                                raise InterruptedError("Movement interrupted")
-                            if deadline is not None and time.time() > deadline:
-                                timeout_triggered = True
-                                try:
-                                    motor.stop()
-                                except Exception:
-                                    pass
-                                self.stop_event.clear()
-                                raise TimeoutError(
-                                    f"Movement timed out after {timeout_val:.2f}s"
+                self.moves_started += 1
+
+            # Motors run without ``self.lock``: the busy gate already serialises
+            # movers, so only the snapshot above and the commit below need it.
+            errors: Dict[str, BaseException] = {}
+            if len(active) == 1 and deadline is None:
+                joint, info = active[0]
+                self._drive_joint_guarded(joint, info, speed_mag, deadline, timeout_val, errors)
+            elif active:
+                # Build HAT motors run independently, so drive every joint
+                # at once and wait for all of them instead of summing the
+                # per-joint motion times. Waiting here (rather than inside a
+                # blocking motor call) lets a deadline fire mid-motion.
+                done = threading.Semaphore(0)
+                for joint, info in active:
+                    self._joint_queue(joint).put(
+                        (joint, info, speed_mag, deadline, timeout_val, errors, done)
+                    )
+                for finished in range(len(active)):
+                    wait_s = None if deadline is None else max(0.0, deadline - time.monotonic())
+                    if not done.acquire(timeout=wait_s):
+                        # Stop every joint, then wait (bounded) for the driver
+                        # threads to return so the next move cannot queue
+                        # behind them or see this move's stop request.
+                        self.stop_event.set()
+                        for _joint, info in active:
+                            self._stop_motor(info["motor"])
+                        drain_deadline = time.monotonic() + STOP_DRAIN_TIMEOUT_S
+                        for _ in range(len(active) - finished):
+                            if not done.acquire(timeout=max(0.0, drain_deadline - time.monotonic())):
+                                logger.warning(
+                                    "Joint drivers still busy %.1fs after stopping a timed-out move",
+                                    STOP_DRAIN_TIMEOUT_S,
                                 )
-                            logger.info(
-                                "Moving joint %s by %.2f degrees at speed %d (%d/%d)",
-                                joint,
-                                chunk,
-                                speed_mag,
-                                idx,
-                                len(chunks),
-                            )
-                            motor.run_for_degrees(chunk, speed=speed_mag, blocking=True)  # type: ignore[arg-type]
-                            self._note_motor_ok()
+                                break
+                        self.stop_event.clear()
+                        timeout_triggered = True
+                        raise TimeoutError(f"Movement timed out after {timeout_val:.2f}s")
+            if errors:
                 self.stop_event.clear()
+                for kind in (InterruptedError, TimeoutError):
+                    for exc in errors.values():
+                        if isinstance(exc, kind):
+                            timeout_triggered = kind is TimeoutError
+                            raise exc
+                raise next(iter(errors.values()))
+            self.stop_event.clear()
 
-                final_positions: Dict[str, float] = {}
-                final_errors: Dict[str, float] = {}
-                finalize_corrections: Dict[str, float] = {}
-
-                def read_position(mtr: Motor) -> Optional[float]:
-                    getter = getattr(mtr, "get_degrees", None) or getattr(mtr, "get_position", None)
-                    if getter:
-                        try:
-                            value = float(getter())
-                            self._note_motor_ok()
-                            return value
-                        except Exception:
-                            return None
-                    return None
+            final_positions: Dict[str, float] = {}
+            final_errors: Dict[str, float] = {}
+            finalize_corrections: Dict[str, float] = {}
 
+            read_position = self._read_degrees
+            try:
                 for joint, info in plan.items():
                     target = float(info["target"])
                     motor = info["motor"]  # type: ignore[assignment]
-                    actual = read_position(motor)
+                    actual = read_position(joint)
                     if actual is None:
                         actual = target
                     pre_actual = actual
@@ -551,7 +796,7 @@ class ArmController:
                             corr_speed,
                         )
                         motor.run_for_degrees(correction, speed=corr_speed, blocking=True)
-                        actual_after = read_position(motor)
+                        actual_after = read_position(joint)
                         if actual_after is not None:
                             actual = actual_after
                         error = target - actual
@@ -566,13 +811,17 @@ class ArmController:
                     final_positions[joint] = actual
                     final_errors[joint] = error
                     finalize_corrections[joint] = correction
-                    self.current_abs[joint] = actual
-
-                self.save_calibration()
-
-            elapsed = time.time() - start_time
+            finally:
+                with self.lock:
+                    self.current_abs.update(final_positions)
+                    new_abs = self.current_abs.copy()
+                    # Positions are not persisted, so there is nothing to save;
+                    # only the cached state body needs rebuilding.
+                    self._state_version += 1
+
+            elapsed = time.monotonic() - start_time
             summary = {
-                "new_abs": self.current_abs.copy(),
+                "new_abs": new_abs,
                 "units": units,
                 "commanded": commanded,
                 "converted_degrees": converted,
@@ -597,34 +846,170 @@ class ArmController:
         finally:
             self._release_busy()
 
+    def move_nowait(self, deltas: Dict[str, float], speed: int = 60) -> Optional[dict]:
+        """Relative degree move for streaming input that never waits for the arm.
+
+        While another motion holds the arm the deltas are accumulated (capped at
+        ``PENDING_DELTA_MAX_DEG`` per joint) and folded into the next call that
+        gets through, rather than being dropped. Returns ``None`` in that case.
+        """
+        with self._pending_lock:
+            pending = self._pending_deltas
+            for joint, delta in deltas.items():
+                total = pending.get(joint, 0.0) + float(delta)
+                pending[joint] = max(-PENDING_DELTA_MAX_DEG, min(PENDING_DELTA_MAX_DEG, total))
+        if not self._acquire_busy():
+            return None
+        try:
+            with self._pending_lock:
+                pending, self._pending_deltas = self._pending_deltas, {}
+            if not pending:
+                return None
+            return self.move("relative", pending, speed=speed, units="degrees")
+        finally:
+            self._release_busy()
+
+    def _joint_queue(self, joint: str) -> "queue.SimpleQueue[Optional[tuple]]":
+        """Return the job queue of ``joint``'s driver thread, starting it if needed."""
+        q = self._joint_queues.get(joint)
+        if q is None:
+            q = queue.SimpleQueue()
+            threading.Thread(
+                target=self._joint_worker, args=(q,), name=f"motor-{joint}", daemon=True
+            ).start()
+            self._joint_queues[joint] = q
+        return q
+
+    def _joint_worker(self, q: "queue.SimpleQueue[Optional[tuple]]") -> None:
+        while True:
+            job = q.get()
+            if job is None:
+                return
+            *args, done = job
+            try:
+                self._drive_joint_guarded(*args)
+            finally:
+                done.release()
+
+    def _drive_joint_guarded(
+        self,
+        joint: str,
+        info: dict,
+        speed_mag: int,
+        deadline: Optional[float],
+        timeout_val: Optional[float],
+        errors: Dict[str, BaseException],
+    ) -> None:
+        try:
+            self._drive_joint(joint, info, speed_mag, deadline, timeout_val)
+        except BaseException as exc:  # reported back to ``move()``
+            errors[joint] = exc
+
+    def _drive_joint(
+        self,
+        joint: str,
+        info: dict,
+        speed_mag: int,
+        deadline: Optional[float],
+        timeout_val: Optional[float],
+    ) -> None:
+        """Run one joint's planned motion; may execute on a per-joint thread.
+
+        Interruptions and timeouts are raised without clearing ``stop_event``
+        so every joint sees a stop request; ``move()`` clears it afterwards.
+        """
+        run_delta = float(info["delta_deg"])
+        motor = info["motor"]
+        now = time.monotonic
+
+        if info.get("is_rotation"):
+            rot_per = float(info.get("rot_per") or self.rotation_deg.get(joint, 360.0) or 360.0)
+            run_rot = run_delta / rot_per
+            if self.stop_event.is_set():
+                raise InterruptedError("Movement interrupted")
+            if deadline is not None and now() > deadline:
+                raise TimeoutError(f"Movement timed out after {timeout_val:.2f}s")
+            logger.info(
+                "Moving joint %s by %.3f rotations at speed %d",
+                joint,
+                run_rot,
+                speed_mag,
+            )
+            motor.run_for_rotations(run_rot, speed=speed_mag, blocking=True)
+            self._note_motor_ok()
+            if deadline is not None and now() > deadline:
+                raise TimeoutError(f"Movement timed out after {timeout_val:.2f}s")
+            return
+
+        max_chunk = 12000.0
+        sign = 1.0 if run_delta >= 0 else -1.0
+        n_full, rest = divmod(abs(run_delta), max_chunk)
+        if rest == 0 and n_full:
+            # An exact multiple ends on a full chunk, not a zero-length one.
+            n_full, rest = n_full - 1, max_chunk
+        chunks = [sign * max_chunk] * int(n_full)
+        chunks.append(sign * rest)
+        stopped = self.stop_event.is_set
+        run_for_degrees = motor.run_for_degrees
+        logger.info(
+            "Moving joint %s by %.2f degrees at speed %d in %d chunk(s)",
+            joint,
+            run_delta,
+            speed_mag,
+            len(chunks),
+        )
+        for chunk in chunks:
+            if stopped():
+                raise InterruptedError("Movement interrupted")
+            if deadline is not None and now() > deadline:
+                try:
+                    motor.stop()
+                except Exception:
+                    pass
+                raise TimeoutError(f"Movement timed out after {timeout_val:.2f}s")
+            run_for_degrees(chunk, speed=speed_mag, blocking=True)
+            self._note_motor_ok()
+
     def last_move_summary(self) -> dict:
-        with self.lock:
-            summary = self._last_move_summary.copy()
-            for key in ("new_abs", "commanded", "converted_degrees", "final_error_deg", "finalize_corrections"):
-                if key in summary and isinstance(summary[key], dict):
-                    summary[key] = summary[key].copy()
-            return summary
+        # The summary is replaced wholesale at the end of ``move()`` so a plain
+        # attribute read is consistent; avoid ``self.lock`` so pollers are not
+        # stalled behind an in-flight motion.
+        summary = self._last_move_summary.copy()
+        for key in ("new_abs", "commanded", "converted_degrees", "final_error_deg", "finalize_corrections"):
+            if key in summary and isinstance(summary[key], dict):
+                summary[key] = summary[key].copy()
+        return summary
 
     # ----- Calibration helpers -----
     def record_named_point(self, joint: str, name: str) -> dict:
         """Store the current position of ``joint`` under ``name``."""
-        with self.lock:
-            if joint not in self.motors:
-                raise ValueError(f"Unknown joint '{joint}'")
-            norm = name.strip().lower().replace(" ", "_")
-            self.points[joint][norm] = self.current_abs[joint]
-            self.save_calibration()
-            return {"points": {j: pts.copy() for j, pts in self.points.items()}}
+        if not self._acquire_busy():
+            raise RuntimeError("BUSY")
+        try:
+            with self.lock:
+                if joint not in self.motors:
+                    raise ValueError(f"Unknown joint '{joint}'")
+                norm = name.strip().lower().replace(" ", "_")
+                self.points[joint][norm] = self.current_abs[joint]
+                self.save_calibration()
+                return {"points": {j: pts.copy() for j, pts in self.points.items()}}
+        finally:
+            self._release_busy()
 
     def reset_calibration(self) -> dict:
         """Clear recorded calibration points, reset limits and mark arm uncalibrated."""
-        with self.lock:
-            self.points = {j: {} for j in self.motors}
-            # Remove any soft limits so joints can move freely until finalized
-            self.limits = {j: None for j in self.motors}
-            self.calibrated = False
-            self.save_calibration()
-            return self.calibration_status()
+        if not self._acquire_busy():
+            raise RuntimeError("BUSY")
+        try:
+            with self.lock:
+                self.points = {j: {} for j in self.motors}
+                # Remove any soft limits so joints can move freely until finalized
+                self.limits = {j: None for j in self.motors}
+                self.calibrated = False
+                self.save_calibration()
+                return self.calibration_status()
+        finally:
+            self._release_busy()
 
     def finalize_calibration(self) -> dict:
         """Derive joint limits and home pose from recorded named points and move."""
@@ -645,32 +1030,11 @@ class ArmController:
                             f"Missing points for joint {j}: {', '.join(sorted(missing))}"
                         )
                 pts = self.points
-                self.limits = {
-                    "A": (
-                        min(pts["A"]["open"], pts["A"]["closed"]),
-                        max(pts["A"]["open"], pts["A"]["closed"]),
-                    ),
-                    "B": (
-                        min(pts["B"]["min"], pts["B"]["max"]),
-                        max(pts["B"]["min"], pts["B"]["max"]),
-                    ),
-                    "C": (
-                        min(pts["C"]["min"], pts["C"]["max"]),
-                        max(pts["C"]["min"], pts["C"]["max"]),
-                    ),
-                    "D": (
-                        min(
-                            pts["D"]["assembly"],
-                            pts["D"]["neutral"],
-                            pts["D"]["quality"],
-                        ),
-                        max(
-                            pts["D"]["assembly"],
-                            pts["D"]["neutral"],
-                            pts["D"]["quality"],
-                        ),
-                    ),
-                }
+                limits = {}
+                for j, names in _LIMIT_POINTS.items():
+                    vals = [pts[j][n] for n in names]
+                    limits[j] = (min(vals), max(vals))
+                self.limits = limits
                 home = {
                     "A": pts["A"]["open"],
                     "B": pts["B"]["min"],
@@ -690,39 +1054,26 @@ class ArmController:
             self._release_busy()
 
     def calibration_status(self) -> dict:
-        with self.lock:
-            return {
-                "points": {j: pts.copy() for j, pts in self.points.items()},
-                "calibrated": self.calibrated,
-            }
+        # Read-only snapshot; does not take ``self.lock`` so it can be served
+        # while a move is running (and from within ``reset_calibration``).
+        return {
+            "points": {j: pts.copy() for j, pts in self.points.items()},
+            "calibrated": self.calibrated,
+        }
 
     def goto_pose(self, name: str, speed: int):
-        poses = {
-            "home": {"A": 0, "B": 0, "C": 0, "D": 0},
-            "pick_left": {"D": -60, "B": -20, "C": 30, "A": 20},
-            "pick_right": {"D": 60, "B": -20, "C": 30, "A": 20},
-            "place_left": {"D": -60, "B": 10, "C": -10, "A": -5},
-            "place_right": {"D": 60, "B": 10, "C": -10, "A": -5},
-        }
-        if name not in poses:
+        pose = _POSES.get(name)
+        if pose is None:
             raise ValueError(f"Unknown pose '{name}'")
         if not self._acquire_busy():
             raise RuntimeError("BUSY")
         try:
-            return self.move("absolute", poses[name], speed=speed)
+            return self.move("absolute", pose, speed=speed)
         finally:
             self._release_busy()
 
     def pickplace(self, location: str, action: str, speed: int):
-        seq_pose = {
-            ("left", "pick"): ["pick_left", "home"],
-            ("left", "place"): ["place_left", "home"],
-            ("right", "pick"): ["pick_right", "home"],
-            ("right", "place"): ["place_right", "home"],
-            ("center", "pick"): ["home"],
-            ("center", "place"): ["home"],
-        }
-        steps = seq_pose.get((location, action))
+        steps = _SEQ_POSE.get((location, action))
         if not steps:
             raise ValueError("Unsupported pick/place combination")
         if not self._acquire_busy():
@@ -747,11 +1098,15 @@ class ArmController:
         return abs_pose
 
     def verify_at(self, target: Dict[str, float], tol_map: Optional[Dict[str, float]] = None) -> tuple[bool, Dict[str, float]]:
-        tol = {"A": 2.0, "B": 3.0, "C": 3.0, "D": 3.0}
-        if tol_map:
-            tol.update(tol_map)
-        errs = {j: abs(self.current_abs.get(j, 0.0) - target.get(j, 0.0)) for j in target}
-        ok = all(errs[j] <= tol[j] for j in target)
+        tol = {**_VERIFY_TOL, **tol_map} if tol_map else _VERIFY_TOL
+        current = self.current_abs
+        errs: Dict[str, float] = {}
+        ok = True
+        for j, want in target.items():
+            err = abs(current.get(j, 0.0) - want)
+            errs[j] = err
+            if err > tol[j]:
+                ok = False
         return ok, errs
 
     def read_position(self) -> Dict[str, float]:
@@ -766,13 +1121,11 @@ class ArmController:
             time.sleep(0.2)
             self.coast(enable=False)
             with self.lock:
-                for j, m in self.motors.items():
-                    getter = getattr(m, "get_degrees", None) or getattr(m, "get_position", None)
-                    if getter:
-                        try:
-                            self.current_abs[j] = float(getter())
-                        except Exception:
-                            pass
+                for j in self.motors:
+                    value = self._read_degrees(j)
+                    if value is not None:
+                        self.current_abs[j] = value
+                self._state_version += 1
                 if self.calibrated and "D" in self.points and "neutral" in self.points["D"]:
                     home = {
                         "A": self.points["A"].get("open", self.current_abs.get("A", 0.0)),
@@ -791,12 +1144,24 @@ class ArmController:
         return {
             "abs_degrees": self.current_abs.copy(),
             "limits": self.limits.copy(),
-            "motors": list(self.motors.keys()),
+            "motors": list(self._motor_names),
             "rotation": self.rotation_deg.copy(),
             "calibrated": self.calibrated,
             "points": {j: pts.copy() for j, pts in self.points.items()},
         }
 
+    def state_body(self) -> bytes:
+        """Return the encoded ``GET /v1/arm/state`` reply, rebuilt only after a change."""
+        version = self._state_version
+        cached = self._state_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        body = _dumps({"ok": True, "data": self.state()})
+        # Tagged with the version read *before* building, so a change that
+        # races with the encode just causes one more rebuild.
+        self._state_cache = (version, body)
+        return body
+
 arm = ArmController()
 # ---------------------------
 # Bluetooth gamepad control
@@ -825,33 +1190,57 @@ def _gamepad_loop(device_path: Optional[str] = None) -> None:  # pragma: no cove
         ecodes.ABS_RX: "B",  # wrist
         ecodes.ABS_RY: "A",  # gripper
     }
-    abs_ranges: Dict[int, tuple[int, int]] = {}
-    for code in axis_map:
+    # Per axis: (joint, centre, 1/half-range), resolved once so each event is
+    # a dict lookup and two float ops.
+    axes: Dict[int, tuple[str, float, float]] = {}
+    for code, joint in axis_map.items():
         try:
             info = dev.absinfo(code)
-            abs_ranges[code] = (info.min, info.max)
+            lo, hi = info.min, info.max
         except Exception:
-            abs_ranges[code] = (-32768, 32767)
-    for event in dev.read_loop():
-        if event.type != ecodes.EV_ABS or event.code not in axis_map:
-            continue
-        lo, hi = abs_ranges[event.code]
-        mid = (lo + hi) / 2.0
-        span = (hi - lo) / 2.0 or 1.0
-        norm = (event.value - mid) / span
-        if abs(norm) < 0.1:
+            lo, hi = -32768, 32767
+        axes[code] = (joint, (lo + hi) / 2.0, 1.0 / ((hi - lo) / 2.0 or 1.0))
+    ev_abs = ecodes.EV_ABS
+    # Sticks report hundreds of events per second per axis. Keep only the
+    # latest deflection per joint and submit one combined step per window.
+    latest: Dict[str, float] = {}
+    deadline: Optional[float] = None
+    while True:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        ready, _, _ = select.select([dev], [], [], timeout)
+        if ready:
+            try:
+                for event in dev.read():
+                    if event.type != ev_abs:
+                        continue
+                    axis = axes.get(event.code)
+                    if axis is None:
+                        continue
+                    joint, mid, inv_span = axis
+                    norm = (event.value - mid) * inv_span
+                    if abs(norm) < 0.1:
+                        latest.pop(joint, None)
+                        continue
+                    latest[joint] = norm
+                    if deadline is None:
+                        deadline = time.monotonic() + GAMEPAD_WINDOW_S
+            except BlockingIOError:
+                pass
+            except OSError as e:
+                logger.error("Gamepad %s read failed: %s", path, e)
+                return
+        if deadline is None or (time.monotonic() < deadline and len(latest) < len(axes)):
             continue
-        joint = axis_map[event.code]
-        deg = norm * 5.0  # small step per event
-        speed = max(10, int(abs(norm) * 100))
-        if not arm._acquire_busy():
+        deadline = None
+        if not latest:
             continue
+        deltas = {joint: norm * 5.0 for joint, norm in latest.items()}  # small step per window
+        speed = max(10, int(max(abs(norm) for norm in latest.values()) * 100))
+        latest.clear()
         try:
-            arm.move("relative", {joint: deg}, speed=speed, units="degrees")
+            arm.move_nowait(deltas, speed=speed)
         except Exception:
             pass
-        finally:
-            arm._release_busy()
 
 
 def _start_gamepad_thread() -> threading.Thread | None:
@@ -868,206 +1257,935 @@ if os.getenv("ENABLE_GAMEPAD", "0") == "1":
 # ---------------------------
 
 API_KEY = os.getenv("API_KEY", "change-me")
+_API_KEY_BYTES = API_KEY.encode("utf-8")
 ALLOW_NO_AUTH_LOCAL = os.getenv("ALLOW_NO_AUTH_LOCAL", "0") == "1"
+_LOOPBACK = frozenset(("127.0.0.1", "::1"))
+
+IDEMPOTENCY_CACHE_TTL = float(os.getenv("IDEM_TTL_S", str(60 * 5)))
+# Bounds for a client-requested ``X-Idempotency-TTL`` (seconds).
+IDEMPOTENCY_TTL_MIN = 60.0
+IDEMPOTENCY_TTL_MAX = 60.0 * 60 * 24
+OPS_TTL = float(os.getenv("OPS_TTL_S", str(60 * 60 * 24)))
+CACHE_SWEEP_INTERVAL_S = 60.0
+
+
+class TTLCache:
+    """LRU mapping whose entries also expire after a per-entry TTL.
+
+    Entries default to ``ttl`` seconds but ``set`` may override it per key.
+    A hit moves the key to the young end, so ``maxsize`` evicts the least
+    recently used entry first.
+    Expiry times live in a min-heap, so ``expire`` only looks at entries that
+    are actually due. Each method holds ``lock`` only for its own O(log n)
+    work.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 10_000, lock: Optional[threading.RLock] = None):
+        self.ttl = float(ttl)
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, tuple[float, object]]" = OrderedDict()
+        self._heap: list[tuple[float, str]] = []
+        self._lock = lock or threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: Optional[float] = None) -> None:
+        expires = time.monotonic() + (self.ttl if ttl is None else float(ttl))
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (expires, value)
+            heapq.heappush(self._heap, (expires, key))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            if len(self._heap) > 2 * self.maxsize:
+                # Drop heap entries left behind by overwritten/evicted keys.
+                self._heap = [(exp, k) for k, (exp, _) in self._data.items()]
+                heapq.heapify(self._heap)
+
+    def __setitem__(self, key: str, value) -> None:
+        self.set(key, value)
+
+    def expire(self) -> int:
+        """Drop every entry whose TTL has elapsed; return how many."""
+        now = time.monotonic()
+        removed = 0
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                expires, key = heapq.heappop(heap)
+                item = self._data.get(key)
+                # Skip stale heap entries for keys that were overwritten.
+                if item is not None and item[0] == expires:
+                    del self._data[key]
+                    removed += 1
+        return removed
+
+
+# One re-entrant lock guards both in-memory stores; request paths only hold
+# it for a single cache operation.
+_store_lock = threading.RLock()
+
+_idem_cache = TTLCache(IDEMPOTENCY_CACHE_TTL, lock=_store_lock)
+
+# Single consumer (``worker``); SimpleQueue is implemented in C and avoids the
+# Lock + Condition pair that ``queue.Queue`` takes on every put/get.
+op_queue: "queue.SimpleQueue[Optional[dict]]" = queue.SimpleQueue()
+ops = TTLCache(OPS_TTL, lock=_store_lock)
+# Admission control for async submissions: one slot per op waiting in
+# ``op_queue``. Submitters give up after a short wait and get a 429.
+OP_QUEUE_MAX = int(os.getenv("OP_QUEUE_MAX", "64"))
+OP_ADMIT_TIMEOUT_S = 0.1
+_op_slots = threading.BoundedSemaphore(OP_QUEUE_MAX)
+# Held by the worker to publish a group's final state in one step.
+ops_lock = _store_lock
+
+
+def _admit_op() -> bool:
+    """Reserve a queue slot for a new async op; False when the server is saturated.
+
+    Only ops still waiting count. Finished records are bounded by the ops
+    store's LRU eviction, and queued ops are always among its most recent
+    entries, so a full store of old results never blocks submissions.
+    """
+    return _op_slots.acquire(timeout=OP_ADMIT_TIMEOUT_S)
+
+
+def _cache_sweeper_loop(interval_s: float) -> None:
+    """Reclaim expired idempotency/op entries even when no requests arrive."""
+    while True:
+        time.sleep(interval_s)
+        _idem_cache.expire()
+        ops.expire()
+
+
+OP_BATCH_MAX = 8
+
+
+def _drain(q: "queue.SimpleQueue[Optional[dict]]", max_batch: int = OP_BATCH_MAX) -> list:
+    """Block for the next op, then take whatever else is already queued.
+
+    Ops pile up naturally while the arm executes the previous batch, so no
+    extra wait is added on top of the blocking ``get``. The batch stays small
+    to keep per-op latency predictable.
+    """
+    batch = [q.get()]
+    while len(batch) < max_batch and batch[-1] is not None:
+        try:
+            batch.append(q.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _is_number(value) -> bool:
+    """True for a finite int/float joint value (bools are not numbers here)."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    return isinstance(value, int) or math.isfinite(value)
+
+
+def _merge_key(op: dict) -> Optional[tuple]:
+    """Return a key shared by relative moves that can run as one command."""
+    if op is None or op["type"] != "move":
+        return None
+    req = op["request"]
+    if req.get("mode", "relative") != "relative" or req.get("timeout_s") is not None:
+        return None
+    joints = req.get("joints")
+    # Point names and anything malformed run on their own, so a bad op can
+    # only ever fail itself.
+    if not isinstance(joints, dict) or not joints or not all(_is_number(v) for v in joints.values()):
+        return None
+    return (
+        req.get("units", "degrees"),
+        int(req.get("speed", 60)),
+        bool(req.get("finalize", True)),
+        req.get("finalize_deadband_deg", 2.0),
+    )
+
+
+def _coalesce(batch: list) -> list:
+    """Group consecutive mergeable moves; every other op stays on its own."""
+    groups: list = []
+    prev_key = None
+    for op in batch:
+        key = _merge_key(op)
+        if key is not None and key == prev_key:
+            groups[-1].append(op)
+        else:
+            groups.append([op])
+        prev_key = key
+    return groups
+
+
+def _merged_request(group: list) -> dict:
+    req = dict(group[0]["request"])
+    joints: Dict[str, float] = {}
+    for op in group:
+        for j, v in op["request"]["joints"].items():
+            joints[j] = joints.get(j, 0.0) + float(v)
+    # The combined delta is clamped once against the joint limits rather than
+    # after every individual step.
+    req["joints"] = joints
+    return req
+
+
+def _do_move(req: dict):
+    deadband = req.get("finalize_deadband_deg", 2.0)
+    try:
+        deadband_val = float(deadband)
+    except (TypeError, ValueError):
+        deadband_val = 2.0
+    return arm.move(
+        req.get("mode", "relative"),
+        req["joints"],
+        speed=int(req.get("speed", 60)),
+        units=req.get("units", "degrees"),
+        timeout_s=req.get("timeout_s"),
+        finalize=req.get("finalize", True),
+        finalize_deadband_deg=deadband_val,
+    )
 
-IDEMPOTENCY_CACHE_TTL = 60 * 5
-_idem_cache: Dict[str, tuple[float, dict]] = {}
-_idem_lock = threading.Lock()
 
-op_queue: "queue.Queue[dict]" = queue.Queue()
-ops: Dict[str, dict] = {}
-ops_lock = threading.Lock()
+def _do_pose(req: dict):
+    return arm.goto_pose(req["name"], int(req.get("speed", 60)))
+
+
+def _do_pickplace(req: dict):
+    return arm.pickplace(req["location"], req["action"], int(req.get("speed", 60)))
+
+
+def _do_process(req: dict):
+    proc = PROCESS_MAP[req["name"]]
+    return proc(arm)
+
+
+_HANDLERS = {
+    "move": _do_move,
+    "pose": _do_pose,
+    "pickplace": _do_pickplace,
+    "process": _do_process,
+}
+
+
+def _publish(group: list, **fields) -> None:
+    """Store an updated copy of every op in ``group`` under one ``ops_lock``.
+
+    Records are replaced rather than mutated in place, so a request thread
+    encoding the dict it fetched never sees it change mid-serialisation.
+    """
+    with ops_lock:
+        for i, op in enumerate(group):
+            group[i] = op = {**op, **fields}
+            ops[op["id"]] = op
+
+
+def _run_ops(group: list) -> None:
+    """Execute one op, or several merged moves sharing a single arm command."""
+    now = time.time
+    started = now()
+    _publish(group, status="running", started_at=started)
+    kind = group[0]["type"] if len(group) == 1 else "move"
+    ids = ", ".join(str(op.get("id")) for op in group)
+    handler = _HANDLERS.get(kind)
+    # Ops that fail before reaching the arm reuse the start timestamp.
+    finished = started
+    moves_before = arm.moves_started
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown op type {kind}")
+        req = group[0]["request"] if len(group) == 1 else _merged_request(group)
+        logger.info("Starting operation %s of type %s", ids, kind)
+        res = handler(req)
+        finished = now()
+        outcome = {"status": "succeeded", "result": res}
+        logger.info("Operation %s succeeded", ids)
+    except Exception as e:
+        if len(group) > 1 and arm.moves_started == moves_before:
+            # The combined command was rejected before the arm moved; run the
+            # ops one at a time so only the one at fault is marked failed.
+            logger.warning("Merged operations %s rejected (%s); running them individually", ids, e)
+            for op in group:
+                _run_ops([op])
+            return
+        if handler is not None:
+            finished = now()
+        outcome = {"status": "failed", "error": {"code": "EXECUTION_ERROR", "message": str(e)}}
+        logger.error("Operation %s failed: %s", ids, e)
+    _publish(group, finished_at=finished, **outcome)
+    logger.info("Finished operation %s with status %s", ids, outcome["status"])
 
 
 def worker():
     while True:
-        op = op_queue.get()
-        if op is None:
-            break
-        try:
-            op["status"] = "running"
-            op["started_at"] = time.time()
-            kind = op["type"]
-            req = op["request"]
-            logger.info("Starting operation %s of type %s", op.get("id"), kind)
-            if kind == "move":
-                deadband = req.get("finalize_deadband_deg", 2.0)
-                try:
-                    deadband_val = float(deadband)
-                except (TypeError, ValueError):
-                    deadband_val = 2.0
-                res = arm.move(
-                    req.get("mode", "relative"),
-                    req["joints"],
-                    speed=int(req.get("speed", 60)),
-                    units=req.get("units", "degrees"),
-                    timeout_s=req.get("timeout_s"),
-                    finalize=req.get("finalize", True),
-                    finalize_deadband_deg=deadband_val,
-                )
-            elif kind == "pose":
-                res = arm.goto_pose(req["name"], int(req.get("speed", 60)))
-            elif kind == "pickplace":
-                res = arm.pickplace(req["location"], req["action"], int(req.get("speed", 60)))
-            elif kind == "process":
-                name = req["name"]
-                proc = PROCESS_MAP[name]
-                res = proc(arm)
-            else:
-                raise ValueError(f"Unknown op type {kind}")
-            op["result"] = res
-            op["status"] = "succeeded"
-            logger.info("Operation %s succeeded", op.get("id"))
-        except Exception as e:
-            op["error"] = {"code": "EXECUTION_ERROR", "message": str(e)}
-            op["status"] = "failed"
-            logger.error("Operation %s failed: %s", op.get("id"), e)
-        finally:
-            op["finished_at"] = time.time()
-            with ops_lock:
-                ops[op["id"]] = op
-            logger.info(
-                "Finished operation %s with status %s", op.get("id"), op["status"]
-            )
-        op_queue.task_done()
+        batch = _drain(op_queue)
+        for op in batch:
+            if op is not None:
+                _op_slots.release()
+        for group in _coalesce(batch):
+            if group[0] is None:
+                return
+            _run_ops(group)
 
 worker_thread = threading.Thread(target=worker, daemon=True)
 worker_thread.start()
 
+sweeper_thread = threading.Thread(
+    target=_cache_sweeper_loop, args=(CACHE_SWEEP_INTERVAL_S,), daemon=True
+)
+sweeper_thread.start()
+
 # ---------------------------
 # HTTP utils
 # ---------------------------
 
+# Endpoints, poses, processes and motors are fixed once the module is loaded,
+# so the inventory body is encoded a single time.
+_INVENTORY_BODY = _dumps({
+    "ok": True,
+    "data": {
+        "endpoints": [
+            "GET /v1/health",
+            "GET /v1/inventory",
+            "GET /v1/arm/state",
+            "GET /v1/arm/rotation",
+            "POST /v1/arm/move",
+            "POST /v1/arm/pose",
+            "POST /v1/arm/stop",
+            "POST /v1/arm/coast",
+            "POST /v1/arm/pickplace",
+            "POST /v1/arm/rotation",
+            "POST /v1/arm/recover",
+            "GET /v1/operations/{id}",
+        ] + [f"POST /v1/processes/{name}" for name in PROCESS_MAP],
+        "poses": list(_POSES),
+        "processes": list(PROCESS_MAP.keys()),
+        "motors": list(arm._motor_names),
+    },
+})
+
+# Responses at or below this size are sent as-is even when the client accepts
+# gzip; the header overhead outweighs any saving.
+GZIP_MIN_BYTES = 512
+_INVENTORY_GZ = gzip.compress(_INVENTORY_BODY, compresslevel=6) if len(_INVENTORY_BODY) > GZIP_MIN_BYTES else None
+
+# Health only varies by timestamp and queue depth; bytes ``%r`` formats the
+# float exactly as ``json`` would, without a separate repr/encode step.
+_HEALTH_TEMPLATE = b'{"ok": true, "data": {"status": "ok", "time": %r, "queue_depth": %d}}'
+
+# Header lines shared by every JSON response (content type + CORS), encoded
+# once and appended to the handler's header buffer as a single chunk.
+_JSON_HEADERS = (
+    b"Content-Type: application/json\r\n"
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Access-Control-Allow-Methods: *\r\n"
+    b"Access-Control-Allow-Headers: *\r\n"
+)
+
+# CORS preflight reply headers; the 204 carries no body.
+_PREFLIGHT_HEADERS = (
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Access-Control-Allow-Methods: POST, GET, OPTIONS\r\n"
+    b"Access-Control-Allow-Headers: *, x-api-key, content-type, X-Idempotency-Key, X-Idempotency-TTL\r\n"
+)
+
+
 def json_response(handler: BaseHTTPRequestHandler, payload: dict, status: int = 200):
-    body = json.dumps(payload).encode("utf-8")
+    json_response_bytes(handler, _dumps(payload), status)
+
+
+@functools.lru_cache(maxsize=None)
+def _error_body(code: str, message: str) -> bytes:
+    """Encode a fixed error payload once; pass only constant messages."""
+    return _dumps({"ok": False, "error": {"code": code, "message": message}})
+
+
+def error_response(handler: BaseHTTPRequestHandler, code: str, message: str, status: int):
+    json_response_bytes(handler, _error_body(code, message), status)
+
+
+def json_response_bytes(
+    handler: BaseHTTPRequestHandler,
+    body: bytes,
+    status: int = 200,
+    gzip_body: Optional[bytes] = None,
+):
+    """Send an already-encoded JSON body (cached or precomputed responses).
+
+    ``gzip_body`` is the compressed form of ``body``; it is sent instead when
+    the client advertises gzip support.
+    """
+    encoded = gzip_body is not None and accepts_gzip(handler)
+    if encoded:
+        body = gzip_body
     handler.send_response(status)
-    handler.send_header("Content-Type", "application/json")
-    handler.send_header("Content-Length", str(len(body)))
-    # CORS
-    handler.send_header("Access-Control-Allow-Origin", "*")
-    handler.send_header("Access-Control-Allow-Methods", "*")
-    handler.send_header("Access-Control-Allow-Headers", "*")
-    handler.end_headers()
+    buf = handler._headers_buffer
+    buf.append(_JSON_HEADERS)
+    buf.append(b"Content-Length: %d\r\n" % len(body))
+    if gzip_body is not None:
+        buf.append(b"Vary: Accept-Encoding\r\n")
+    if encoded:
+        buf.append(b"Content-Encoding: gzip\r\n")
+    write_with_headers(handler, body)
+
+
+def accepts_gzip(handler: BaseHTTPRequestHandler) -> bool:
+    for part in handler.headers.get("Accept-Encoding", "").split(","):
+        name, _, params = part.partition(";")
+        if name.strip().lower() == "gzip":
+            q = params.replace(" ", "").lower()
+            if q.startswith("q="):
+                try:
+                    return float(q[2:]) > 0
+                except ValueError:
+                    return False
+            return True
+    return False
+
+
+def gzip_for(handler: BaseHTTPRequestHandler, body: bytes) -> Optional[bytes]:
+    """Compress a dynamic ``body`` when it is large enough and the client wants it."""
+    if len(body) <= GZIP_MIN_BYTES or not accepts_gzip(handler):
+        return None
+    # Level 1: most of the size win on JSON for a fraction of the CPU.
+    return gzip.compress(body, compresslevel=1)
+
+
+def write_with_headers(handler: BaseHTTPRequestHandler, body: bytes) -> None:
+    """Finish the header block and send it together with ``body``.
+
+    ``end_headers()`` flushes the buffered headers on their own and the body
+    would follow as a second send; joining them keeps each response to a
+    single write on the socket.
+    """
+    if handler.close_connection:
+        handler._headers_buffer.append(b"Connection: close\r\n")
+    handler._headers_buffer.append(b"\r\n")
+    head = b"".join(handler._headers_buffer)
+    handler._headers_buffer = []
     try:
-        handler.wfile.write(body)
-    except BrokenPipeError:
-        # Client closed connection before we could reply; ignore
-        pass
+        handler.wfile.write(head + body)
+    except (BrokenPipeError, ConnectionResetError):
+        # Client closed connection before we could reply; stop reading further
+        # requests from this kept-alive socket.
+        handler.close_connection = True
+
+
+# Static assets up to this size are kept in memory (keyed by mtime, so edits
+# are picked up); larger ones are streamed from disk with ``sendfile``.
+STATIC_CACHE_MAX_BYTES = 64 * 1024
+
+
+@functools.lru_cache(maxsize=32)
+def _read_small_file(path: str, mtime_ns: int, size: int) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _etag_matches(handler: BaseHTTPRequestHandler, etag: str) -> bool:
+    header = handler.headers.get("If-None-Match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (t.strip() for t in header.split(","))
+
+
+def send_file(handler: BaseHTTPRequestHandler, path: str, ctype: str) -> None:
+    """Send ``path`` as a 200 (or 304) response; raises ``FileNotFoundError`` if missing."""
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        # mtime+size identify a file version without hashing its contents.
+        etag = '"%x-%x"' % (st.st_mtime_ns, st.st_size)
+        # The HTML shell is revalidated on every load so a redeployed UI shows
+        # up at once; other assets may be reused for an hour.
+        cache_control = "no-cache" if ctype.startswith("text/html") else "public, max-age=3600"
+        if _etag_matches(handler, etag):
+            handler.send_response(304)
+            handler.send_header("ETag", etag)
+            handler.send_header("Cache-Control", cache_control)
+            write_with_headers(handler, b"")
+            return
+        handler.send_response(200)
+        handler.send_header("Content-Type", ctype)
+        handler.send_header("Content-Length", str(st.st_size))
+        handler.send_header("ETag", etag)
+        handler.send_header("Cache-Control", cache_control)
+        if st.st_size <= STATIC_CACHE_MAX_BYTES:
+            write_with_headers(handler, _read_small_file(path, st.st_mtime_ns, st.st_size))
+            return
+        write_with_headers(handler, b"")
+        try:
+            handler.wfile.flush()
+            # Falls back to read/send internally where sendfile is unavailable.
+            handler.connection.sendfile(f, 0, st.st_size)
+        except (BrokenPipeError, ConnectionResetError):
+            handler.close_connection = True
+
+
+# Control requests are small JSON documents; anything larger is refused
+# before it is read.
+MAX_BODY_BYTES = int(os.getenv("MAX_BODY_BYTES", str(64 * 1024)))
+
+
+def body_error(handler: BaseHTTPRequestHandler) -> Optional[tuple[str, str, int]]:
+    """Return ``(code, message, status)`` if the request body cannot be read.
+
+    The body must be framed by a sane ``Content-Length`` so ``parse_json``
+    can take it in one read; otherwise the request is answered without
+    reading and the connection is closed.
+    """
+    if handler.headers.get("Transfer-Encoding"):
+        return "LENGTH_REQUIRED", "Send the body with Content-Length", 411
+    raw = handler.headers.get("Content-Length")
+    if raw is None:
+        return None
+    try:
+        length = int(raw)
+    except ValueError:
+        return "BAD_LENGTH", "Invalid Content-Length", 400
+    if length < 0:
+        return "BAD_LENGTH", "Invalid Content-Length", 400
+    if length > MAX_BODY_BYTES:
+        return "BODY_TOO_LARGE", "Request body too large", 413
+    return None
 
 
 def parse_json(handler: BaseHTTPRequestHandler):
     length = int(handler.headers.get("Content-Length", 0))
     if length == 0:
+        handler.raw_body = b""
         return {}
     data = handler.rfile.read(length)
+    handler.raw_body = data
     try:
-        return json.loads(data.decode("utf-8"))
+        return _loads(data)
     except Exception:
         return {}
 
 
-def auth_ok(handler: BaseHTTPRequestHandler) -> Optional[tuple[dict, int]]:
+_AUTH_NO_KEY = (_error_body("NO_API_KEY", "Provide x-api-key"), 401)
+_AUTH_BAD_KEY = (_error_body("BAD_API_KEY", "Invalid x-api-key"), 401)
+
+
+def auth_ok(handler: BaseHTTPRequestHandler) -> Optional[tuple[bytes, int]]:
     # allow localhost without key if configured
-    if ALLOW_NO_AUTH_LOCAL and handler.client_address[0] in {"127.0.0.1", "::1"}:
+    if ALLOW_NO_AUTH_LOCAL and handler.client_address[0] in _LOOPBACK:
         return None
     key = handler.headers.get("x-api-key")
     if not key:
-        return ({"ok": False, "error": {"code": "NO_API_KEY", "message": "Provide x-api-key"}}, 401)
-    if key != API_KEY:
-        return ({"ok": False, "error": {"code": "BAD_API_KEY", "message": "Invalid x-api-key"}}, 401)
+        return _AUTH_NO_KEY
+    # Constant-time comparison so response timing does not leak the key.
+    if not hmac.compare_digest(key.encode("utf-8"), _API_KEY_BYTES):
+        return _AUTH_BAD_KEY
     return None
 
 
-def idem_get(handler: BaseHTTPRequestHandler):
+def requires_auth(route):
+    """Wrap a GET route so it answers 401 unless ``auth_ok`` passes."""
+
+    @functools.wraps(route)
+    def wrapper(handler: BaseHTTPRequestHandler, *args):
+        if (resp := auth_ok(handler)):
+            return json_response_bytes(handler, resp[0], resp[1])
+        return route(handler, *args)
+
+    return wrapper
+
+
+def _idem_key(handler: BaseHTTPRequestHandler) -> Optional[str]:
+    """Return the replay-cache key: the client's key plus a body digest.
+
+    Reusing an idempotency key with a different body is a new request, not a
+    retry, so it must not be answered with the earlier reply.
+    """
     key = handler.headers.get("X-Idempotency-Key")
     if not key:
         return None
-    now = time.time()
-    with _idem_lock:
-        expired = [k for k, (t, _) in _idem_cache.items() if now - t > IDEMPOTENCY_CACHE_TTL]
-        for k in expired:
-            _idem_cache.pop(k, None)
-        if key in _idem_cache:
-            return _idem_cache[key][1]
-    return None
+    digest = hashlib.blake2b(getattr(handler, "raw_body", b""), digest_size=8).hexdigest()
+    return f"{key}:{digest}"
 
 
-def idem_store(handler: BaseHTTPRequestHandler, payload: dict):
-    key = handler.headers.get("X-Idempotency-Key")
+def idem_get(handler: BaseHTTPRequestHandler):
+    key = _idem_key(handler)
     if not key:
-        return
-    with _idem_lock:
-        _idem_cache[key] = (time.time(), payload)
+        return None
+    return _idem_cache.get(key)
+
+
+def idem_store(handler: BaseHTTPRequestHandler, payload: dict) -> bytes:
+    """Encode ``payload`` once, remember it for replays and return the body."""
+    body = _dumps(payload)
+    key = _idem_key(handler)
+    if key:
+        _idem_cache.set(key, body, _idem_ttl(handler))
+    return body
+
+
+def _idem_ttl(handler: BaseHTTPRequestHandler) -> Optional[float]:
+    """Return the client-requested replay TTL, clamped to sane bounds."""
+    raw = handler.headers.get("X-Idempotency-TTL")
+    if not raw:
+        return None
+    try:
+        ttl = float(raw)
+    except ValueError:
+        return None
+    if ttl != ttl:  # NaN
+        return None
+    return max(IDEMPOTENCY_TTL_MIN, min(IDEMPOTENCY_TTL_MAX, ttl))
 
 # ---------------------------
 # Request handler
 # ---------------------------
 
+KEEPALIVE_TIMEOUT_S = 30
+# Connections allowed to stay open between requests; further connections are
+# answered once and closed.
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "32"))
+# Requests handled at once; idle keep-alive connections do not count, and
+# ``POST /v1/arm/stop`` never waits for a slot.
+HTTP_MAX_WORKERS = int(os.getenv("HTTP_MAX_WORKERS", "8"))
+
+# GET routes take the handler; POST routes also take the parsed JSON body.
+# ``do_GET``/``do_POST`` resolve exact paths with one dict lookup and only fall
+# back to prefix matching (operations, processes) or static files on a miss.
+# Authenticated GET routes are wrapped with ``requires_auth``; POST routes are
+# authenticated once in ``do_POST``.
+
+def _get_ui(handler: "Handler"):
+    return handler.serve_ui()
+
+
+def _get_health(handler: "Handler"):
+    return json_response_bytes(handler, _HEALTH_TEMPLATE % (time.time(), op_queue.qsize()))
+
+
+@requires_auth
+def _get_inventory(handler: "Handler"):
+    return json_response_bytes(handler, _INVENTORY_BODY, gzip_body=_INVENTORY_GZ)
+
+
+@requires_auth
+def _get_state(handler: "Handler"):
+    return json_response_bytes(handler, arm.state_body())
+
+
+@requires_auth
+def _get_rotation(handler: "Handler"):
+    return json_response(handler, {"ok": True, "data": {"rotation": arm.rotation_deg.copy()}})
+
+
+@requires_auth
+def _get_last_move(handler: "Handler"):
+    return json_response(handler, {"ok": True, "data": arm.last_move_summary()})
+
+
+@requires_auth
+def _get_calibration(handler: "Handler"):
+    return json_response(handler, {"ok": True, "data": arm.calibration_status()})
+
+
+@requires_auth
+def _get_operation(handler: "Handler", op_id: str):
+    op = ops.get(op_id)
+    if not op:
+        return error_response(handler, "NOT_FOUND", "Unknown operation id", 404)
+    body = _dumps({"ok": True, "data": op})
+    return json_response_bytes(handler, body, gzip_body=gzip_for(handler, body))
+
+
+_GET_ROUTES = {
+    "/": _get_ui,
+    "/index.html": _get_ui,
+    "/ui": _get_ui,
+    "/v1/health": _get_health,
+    "/v1/inventory": _get_inventory,
+    "/v1/arm/state": _get_state,
+    "/v1/arm/rotation": _get_rotation,
+    "/v1/arm/last_move": _get_last_move,
+    "/v1/arm/calibration": _get_calibration,
+}
+
+_OPERATIONS_PREFIX = "/v1/operations/"
+_PROCESSES_PREFIX = "/v1/processes/"
+
+
+def _new_op_id() -> str:
+    # Opaque to clients; 128 random bits, the same entropy as the uuid4 ids
+    # this replaced, without building a UUID object.
+    return secrets.token_hex(16)
+
+
+def _queue_op(handler: "Handler", kind: str, request: dict):
+    if not _admit_op():
+        return error_response(handler, "BUSY", "Server queue full", 429)
+    op = {
+        "id": _new_op_id(),
+        "type": kind,
+        "status": "queued",
+        "submitted_at": time.time(),
+        "request": request,
+    }
+    ops[op["id"]] = op
+    op_queue.put(op)
+    resp = {"ok": True, "data": {"operation_id": op["id"], "status": op["status"]}}
+    return json_response_bytes(handler, idem_store(handler, resp))
+
+
+def _post_stop(handler: "Handler", body: dict):
+    arm.stop_all()
+    return json_response(handler, {"ok": True, "data": {"stopped": True, "reason": body.get("reason")}})
+
+
+def _post_process(handler: "Handler", body: dict):
+    name = urlparse(handler.path).path[len(_PROCESSES_PREFIX):]
+    if name not in PROCESS_MAP:
+        return error_response(handler, "UNKNOWN_PROCESS", "Unknown process", 404)
+    return _queue_op(handler, "process", {"name": name})
+
+
+def _post_move(handler: "Handler", body: dict):
+    mode = body.get("mode", "relative")
+    joints = body.get("joints") or {}
+    speed = int(body.get("speed", 60))
+    timeout_s = body.get("timeout_s")
+    units_present = "units" in body
+    units = body.get("units") or "degrees"
+    finalize = body.get("finalize", True)
+    finalize_deadband = body.get("finalize_deadband_deg", 2.0)
+    async_exec = bool(body.get("async_exec", True))
+    if not isinstance(joints, dict) or not joints:
+        return error_response(handler, "BAD_MOVE", "Provide joints map", 400)
+    if not all(isinstance(v, str) or _is_number(v) for v in joints.values()):
+        return error_response(handler, "BAD_MOVE", "Joint values must be numbers or point names", 400)
+    units = str(units).lower()
+    if units not in {"degrees", "rotations"}:
+        return error_response(handler, "BAD_UNITS", "units must be 'degrees' or 'rotations'", 400)
+    if not units_present:
+        logger.warning("Move request missing units; defaulting to degrees")
+    if timeout_s is not None:
+        try:
+            timeout_s = float(timeout_s)
+        except (TypeError, ValueError):
+            return error_response(handler, "BAD_TIMEOUT", "timeout_s must be a number", 400)
+    try:
+        finalize_deadband_val = float(finalize_deadband)
+    except (TypeError, ValueError):
+        return error_response(handler, "BAD_FINALIZE", "finalize_deadband_deg must be numeric", 400)
+    request_payload = {
+        "mode": mode,
+        "joints": joints,
+        "speed": speed,
+        "units": units,
+        "finalize": bool(finalize),
+        "finalize_deadband_deg": finalize_deadband_val,
+    }
+    if timeout_s is not None:
+        request_payload["timeout_s"] = timeout_s
+    if async_exec:
+        return _queue_op(handler, "move", request_payload)
+    res = arm.move(
+        mode,
+        joints,
+        speed=speed,
+        units=units,
+        timeout_s=timeout_s,
+        finalize=bool(finalize),
+        finalize_deadband_deg=finalize_deadband_val,
+    )
+    resp = {"ok": True, "data": res}
+    return json_response_bytes(handler, idem_store(handler, resp))
+
+
+def _post_pose(handler: "Handler", body: dict):
+    name = body.get("name")
+    speed = int(body.get("speed", 60))
+    async_exec = bool(body.get("async_exec", True))
+    if not name:
+        return error_response(handler, "BAD_POSE", "Provide pose name", 400)
+    if not isinstance(name, str) or name not in _POSES:
+        return error_response(handler, "BAD_POSE", "Unknown pose", 400)
+    if async_exec:
+        return _queue_op(handler, "pose", {"name": name, "speed": speed})
+    res = arm.goto_pose(name, speed)
+    resp = {"ok": True, "data": res}
+    return json_response_bytes(handler, idem_store(handler, resp))
+
+
+def _post_coast(handler: "Handler", body: dict):
+    motors = body.get("motors")
+    if motors is not None and not isinstance(motors, list):
+        return error_response(handler, "BAD_COAST", "motors must be list", 400)
+    enable = bool(body.get("enable", True))
+    res = arm.coast(motors, enable)
+    resp = {"ok": True, "data": res}
+    return json_response_bytes(handler, idem_store(handler, resp))
+
+
+def _post_pickplace(handler: "Handler", body: dict):
+    location = body.get("location", "center")
+    action = body.get("action")
+    speed = int(body.get("speed", 60))
+    async_exec = bool(body.get("async_exec", True))
+    if action not in ("pick", "place"):
+        return error_response(handler, "BAD_PICKPLACE", "action must be 'pick' or 'place'", 400)
+    # Checked against the sequence table so async ops never queue a
+    # combination the worker would only reject later.
+    if not isinstance(location, str) or (location, action) not in _SEQ_POSE:
+        return error_response(handler, "BAD_PICKPLACE", "Unknown location", 400)
+    if async_exec:
+        return _queue_op(handler, "pickplace", {"location": location, "action": action, "speed": speed})
+    res = arm.pickplace(location, action, speed)
+    resp = {"ok": True, "data": res}
+    return json_response_bytes(handler, idem_store(handler, resp))
+
+
+def _post_rotation(handler: "Handler", body: dict):
+    vals = body.get("rotation") if isinstance(body, dict) else None
+    if vals is None:
+        vals = body
+    if not isinstance(vals, dict):
+        return error_response(handler, "BAD_ROTATION", "Provide rotation map", 400)
+    res = arm.set_rotation(vals)
+    resp = {"ok": True, "data": res}
+    return json_response_bytes(handler, idem_store(handler, resp))
+
+
+def _post_calibration(handler: "Handler", body: dict):
+    if body.get("reset"):
+        res = arm.reset_calibration()
+        resp = {"ok": True, "data": res}
+        return json_response_bytes(handler, idem_store(handler, resp))
+    if body.get("finalize"):
+        try:
+            res = arm.finalize_calibration()
+            resp = {"ok": True, "data": res}
+            return json_response_bytes(handler, idem_store(handler, resp))
+        except Exception as e:
+            return json_response(handler, {"ok": False, "error": {"code": "CALIB_ERROR", "message": str(e)}}, 400)
+    if body.get("joint") and body.get("name"):
+        res = arm.record_named_point(str(body["joint"]), str(body["name"]))
+        resp = {"ok": True, "data": res}
+        return json_response_bytes(handler, idem_store(handler, resp))
+    return json_response(
+        handler,
+        {
+            "ok": False,
+            "error": {"code": "BAD_CALIB", "message": "Provide joint/name or finalize"},
+        },
+        400,
+    )
+
+
+def _post_recover(handler: "Handler", body: dict):
+    speed = int(body.get("speed", 30))
+    timeout_s = body.get("timeout_s", 90.0)
+    res = arm.recover_to_home(speed=speed, timeout_s=timeout_s)
+    resp = {"ok": True, "data": res}
+    return json_response_bytes(handler, idem_store(handler, resp))
+
+
+_POST_ROUTES = {
+    "/v1/arm/stop": _post_stop,
+    "/v1/arm/move": _post_move,
+    "/v1/arm/pose": _post_pose,
+    "/v1/arm/coast": _post_coast,
+    "/v1/arm/pickplace": _post_pickplace,
+    "/v1/arm/rotation": _post_rotation,
+    "/v1/arm/calibration": _post_calibration,
+    "/v1/arm/recover": _post_recover,
+}
+
+# Routes that drive named poses and therefore need finalized calibration.
+_NEEDS_CALIBRATION = frozenset((_post_pose, _post_pickplace, _post_process))
+
+# Endpoints the UI polls several times a second; successful hits are not
+# written to the access or application log.
+_QUIET_PATHS = frozenset(("/v1/health", "/v1/arm/state"))
+
+
 class Handler(BaseHTTPRequestHandler):
+    # Persistent connections: polling clients reuse one socket instead of a
+    # new TCP (and ngrok TLS) handshake per request. Every response carries
+    # Content-Length, which HTTP/1.1 framing requires.
+    protocol_version = "HTTP/1.1"
+    # Idle keep-alive connections are dropped after this many seconds so
+    # they do not pin server threads forever.
+    timeout = KEEPALIVE_TIMEOUT_S
+    # Fully buffered writer; the base handler flushes once per request.
+    wbufsize = -1
+
+    # Set when the server is out of keep-alive slots: serve one request and
+    # close, so idle sockets cannot pile up on this server.
+    one_shot = False
+
+    def setup(self):
+        super().setup()
+        try:
+            # Small JSON replies should not wait on Nagle's algorithm.
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except (AttributeError, OSError):
+            pass
+
+    def handle(self):
+        slots = getattr(self.server, "keepalive_slots", None)
+        if slots is None:
+            return super().handle()
+        if not slots.acquire(blocking=False):
+            self.one_shot = True
+            self.close_connection = True
+            return self.handle_one_request()
+        try:
+            super().handle()
+        finally:
+            slots.release()
+
+    def parse_request(self):
+        ok = super().parse_request()
+        if self.one_shot:
+            self.close_connection = True
+        return ok
+
+    def log_request(self, code="-", size="-"):
+        if self.path in _QUIET_PATHS and isinstance(code, int) and code < 400:
+            return
+        super().log_request(code, size)
+
     def do_OPTIONS(self):
         self.send_response(204)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "POST, GET, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "*, x-api-key, content-type, X-Idempotency-Key")
-        self.end_headers()
+        self._headers_buffer.append(_PREFLIGHT_HEADERS)
+        write_with_headers(self, b"")
 
     def do_GET(self):
-        logger.info("GET %s from %s", self.path, self.client_address[0])
-        parsed = urlparse(self.path)
-        path = parsed.path
-        if path in {"/", "/index.html", "/ui"}:
-            return self.serve_ui()
-        if path == "/v1/health":
-            return json_response(self, {"ok": True, "data": {"status": "ok", "time": time.time()}})
-        if path == "/v1/inventory":
-            if (resp := auth_ok(self)):
-                return json_response(self, resp[0], resp[1])
-            process_eps = [f"POST /v1/processes/{name}" for name in PROCESS_MAP]
-            data = {
-                "endpoints": [
-                    "GET /v1/health",
-                    "GET /v1/inventory",
-                    "GET /v1/arm/state",
-                    "GET /v1/arm/rotation",
-                    "POST /v1/arm/move",
-                    "POST /v1/arm/pose",
-                    "POST /v1/arm/stop",
-                    "POST /v1/arm/coast",
-                    "POST /v1/arm/pickplace",
-                    "POST /v1/arm/rotation",
-                    "POST /v1/arm/recover",
-                    "GET /v1/operations/{id}",
-                ] + process_eps,
-                "poses": ["home", "pick_left", "pick_right", "place_left", "place_right"],
-                "processes": list(PROCESS_MAP.keys()),
-                "motors": list(arm.motors.keys()),
-            }
-            return json_response(self, {"ok": True, "data": data})
-        if path == "/v1/arm/state":
-            if (resp := auth_ok(self)):
-                return json_response(self, resp[0], resp[1])
-            return json_response(self, {"ok": True, "data": arm.state()})
-        if path == "/v1/arm/rotation":
-            if (resp := auth_ok(self)):
-                return json_response(self, resp[0], resp[1])
-            return json_response(self, {"ok": True, "data": {"rotation": arm.rotation_deg.copy()}})
-        if path == "/v1/arm/last_move":
-            if (resp := auth_ok(self)):
-                return json_response(self, resp[0], resp[1])
-            return json_response(self, {"ok": True, "data": arm.last_move_summary()})
-        if path == "/v1/arm/calibration":
-            if (resp := auth_ok(self)):
-                return json_response(self, resp[0], resp[1])
-            return json_response(self, {"ok": True, "data": arm.calibration_status()})
-        if path.startswith("/v1/operations/"):
-            if (resp := auth_ok(self)):
-                return json_response(self, resp[0], resp[1])
-            op_id = path.split("/v1/operations/")[-1]
-            with ops_lock:
-                op = ops.get(op_id)
-            if not op:
-                return json_response(self, {"ok": False, "error": {"code": "NOT_FOUND", "message": "Unknown operation id"}}, 404)
-            return json_response(self, {"ok": True, "data": op})
+        with self.server.request_slots:
+            return self._serve_get()
+
+    def _serve_get(self):
+        if self.path not in _QUIET_PATHS:
+            logger.info("GET %s from %s", self.path, self.client_address[0])
+        # Most requests carry no query string, so try the raw path first and
+        # only pay for ``urlparse`` on a miss.
+        path = self.path
+        route = _GET_ROUTES.get(path)
+        if route is None:
+            path = urlparse(path).path
+            route = _GET_ROUTES.get(path)
+        if route is not None:
+            return route(self)
+        if path.startswith(_OPERATIONS_PREFIX):
+            return _get_operation(self, path[len(_OPERATIONS_PREFIX):])
         # attempt to serve static files from WEB_DIR
         if not path.startswith("/v1/"):
             rel_path = os.path.normpath(path.lstrip("/"))
@@ -1075,260 +2193,67 @@ class Handler(BaseHTTPRequestHandler):
                 static_path = os.path.join(WEB_DIR, rel_path)
                 if os.path.isfile(static_path):
                     return self.serve_static(static_path)
-        return json_response(self, {"ok": False, "error": {"code": "NOT_FOUND", "message": "Unknown path"}}, 404)
+        return error_response(self, "NOT_FOUND", "Unknown path", 404)
 
     def serve_ui(self):
         try:
-            with open(os.path.join(WEB_DIR, "index.html"), "rb") as f:
-                body = f.read()
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html; charset=utf-8")
-            self.send_header("Content-Length", str(len(body)))
-            self.end_headers()
-            try:
-                self.wfile.write(body)
-            except BrokenPipeError:
-                pass
+            send_file(self, os.path.join(WEB_DIR, "index.html"), "text/html; charset=utf-8")
         except FileNotFoundError:
-            json_response(self, {"ok": False, "error": {"code": "UI_MISSING", "message": "UI not found"}}, 500)
+            error_response(self, "UI_MISSING", "UI not found", 500)
 
     def serve_static(self, filepath: str):
+        ctype, _ = mimetypes.guess_type(filepath)
         try:
-            with open(filepath, "rb") as f:
-                body = f.read()
-            ctype, _ = mimetypes.guess_type(filepath)
-            self.send_response(200)
-            self.send_header("Content-Type", ctype or "application/octet-stream")
-            self.send_header("Content-Length", str(len(body)))
-            self.end_headers()
-            try:
-                self.wfile.write(body)
-            except BrokenPipeError:
-                pass
+            send_file(self, filepath, ctype or "application/octet-stream")
         except FileNotFoundError:
-            return json_response(self, {"ok": False, "error": {"code": "NOT_FOUND", "message": "Unknown path"}}, 404)
+            return error_response(self, "NOT_FOUND", "Unknown path", 404)
 
     def do_POST(self):
         logger.info("POST %s from %s", self.path, self.client_address[0])
-        parsed = urlparse(self.path)
-        path = parsed.path
-        if path.startswith("/v1/processes/") or path in ("/v1/arm/move", "/v1/arm/pose", "/v1/arm/pickplace", "/v1/arm/stop", "/v1/arm/coast", "/v1/arm/calibration", "/v1/arm/recover", "/v1/arm/rotation"):
-            if (resp := auth_ok(self)):
-                return json_response(self, resp[0], resp[1])
-        if path == "/v1/arm/stop":
-            arm.stop_all()
-            body = parse_json(self)
-            return json_response(self, {"ok": True, "data": {"stopped": True, "reason": body.get("reason")}})
-
-        if not arm.calibrated and (path.startswith("/v1/processes/") or path in ("/v1/arm/pose", "/v1/arm/pickplace")):
-            return json_response(self, {"ok": False, "error": {"code": "NOT_CALIBRATED", "message": "Calibration required"}}, 400)
+        # Consume the body before any early return so a kept-alive connection
+        # never has leftover bytes in front of the next request.
+        if (err := body_error(self)):
+            self.close_connection = True
+            return error_response(self, *err)
+        body = parse_json(self)
+        path = self.path
+        route = _POST_ROUTES.get(path)
+        if route is None:
+            path = urlparse(path).path
+            route = _POST_ROUTES.get(path)
+            if route is None and path.startswith(_PROCESSES_PREFIX):
+                route = _post_process
+        if route is None:
+            return error_response(self, "NOT_FOUND", "Unknown path", 404)
+        if (resp := auth_ok(self)):
+            return json_response_bytes(self, resp[0], resp[1])
+        if route is _post_stop:
+            # Stop bypasses calibration, idempotency and the request slots
+            # entirely, so it is answered even when every slot is taken.
+            return _post_stop(self, body)
+        with self.server.request_slots:
+            return self._serve_post(route, path, body)
+
+    def _serve_post(self, route, path: str, body: dict):
+        if not arm.calibrated and route in _NEEDS_CALIBRATION:
+            return error_response(self, "NOT_CALIBRATED", "Calibration required", 400)
 
         cached = idem_get(self)
         if cached:
-            return json_response(self, cached)
+            return json_response_bytes(self, cached)
 
         try:
-            body = parse_json(self)
-            if path.startswith("/v1/processes/"):
-                name = path.split("/v1/processes/")[-1]
-                if name not in PROCESS_MAP:
-                    return json_response(self, {"ok": False, "error": {"code": "UNKNOWN_PROCESS", "message": "Unknown process"}}, 404)
-                op = {
-                    "id": str(uuid.uuid4()),
-                    "type": "process",
-                    "status": "queued",
-                    "submitted_at": time.time(),
-                    "request": {"name": name},
-                }
-                with ops_lock:
-                    ops[op["id"]] = op
-                op_queue.put(op)
-                resp = {"ok": True, "data": {"operation_id": op["id"], "status": op["status"]}}
-                idem_store(self, resp)
-                return json_response(self, resp)
-
-            if path == "/v1/arm/move":
-                mode = body.get("mode", "relative")
-                joints = body.get("joints") or {}
-                speed = int(body.get("speed", 60))
-                timeout_s = body.get("timeout_s")
-                units_present = "units" in body
-                units = body.get("units") or "degrees"
-                finalize = body.get("finalize", True)
-                finalize_deadband = body.get("finalize_deadband_deg", 2.0)
-                async_exec = bool(body.get("async_exec", True))
-                if not isinstance(joints, dict) or not joints:
-                    return json_response(self, {"ok": False, "error": {"code": "BAD_MOVE", "message": "Provide joints map"}}, 400)
-                units = str(units).lower()
-                if units not in {"degrees", "rotations"}:
-                    return json_response(self, {"ok": False, "error": {"code": "BAD_UNITS", "message": "units must be 'degrees' or 'rotations'"}}, 400)
-                if not units_present:
-                    logger.warning("Move request missing units; defaulting to degrees")
-                if timeout_s is not None:
-                    try:
-                        timeout_s = float(timeout_s)
-                    except (TypeError, ValueError):
-                        return json_response(self, {"ok": False, "error": {"code": "BAD_TIMEOUT", "message": "timeout_s must be a number"}}, 400)
-                try:
-                    finalize_deadband_val = float(finalize_deadband)
-                except (TypeError, ValueError):
-                    return json_response(self, {"ok": False, "error": {"code": "BAD_FINALIZE", "message": "finalize_deadband_deg must be numeric"}}, 400)
-                request_payload = {
-                    "mode": mode,
-                    "joints": joints,
-                    "speed": speed,
-                    "units": units,
-                    "finalize": bool(finalize),
-                    "finalize_deadband_deg": finalize_deadband_val,
-                }
-                if timeout_s is not None:
-                    request_payload["timeout_s"] = timeout_s
-                if async_exec:
-                    op = {
-                        "id": str(uuid.uuid4()),
-                        "type": "move",
-                        "status": "queued",
-                        "submitted_at": time.time(),
-                        "request": request_payload,
-                    }
-                    with ops_lock:
-                        ops[op["id"]] = op
-                    op_queue.put(op)
-                    resp = {"ok": True, "data": {"operation_id": op["id"], "status": op["status"]}}
-                    idem_store(self, resp)
-                    return json_response(self, resp)
-                res = arm.move(
-                    mode,
-                    joints,
-                    speed=speed,
-                    units=units,
-                    timeout_s=timeout_s,
-                    finalize=bool(finalize),
-                    finalize_deadband_deg=finalize_deadband_val,
-                )
-                resp = {"ok": True, "data": res}
-                idem_store(self, resp)
-                return json_response(self, resp)
-
-            if path == "/v1/arm/pose":
-                name = body.get("name")
-                speed = int(body.get("speed", 60))
-                async_exec = bool(body.get("async_exec", True))
-                if not name:
-                    return json_response(self, {"ok": False, "error": {"code": "BAD_POSE", "message": "Provide pose name"}}, 400)
-                if async_exec:
-                    op = {
-                        "id": str(uuid.uuid4()),
-                        "type": "pose",
-                        "status": "queued",
-                        "submitted_at": time.time(),
-                        "request": body,
-                    }
-                    with ops_lock:
-                        ops[op["id"]] = op
-                    op_queue.put(op)
-                    resp = {"ok": True, "data": {"operation_id": op["id"], "status": op["status"]}}
-                    idem_store(self, resp)
-                    return json_response(self, resp)
-                res = arm.goto_pose(name, speed)
-                resp = {"ok": True, "data": res}
-                idem_store(self, resp)
-                return json_response(self, resp)
-
-            if path == "/v1/arm/coast":
-                motors = body.get("motors")
-                if motors is not None and not isinstance(motors, list):
-                    return json_response(self, {"ok": False, "error": {"code": "BAD_COAST", "message": "motors must be list"}}, 400)
-                enable = bool(body.get("enable", True))
-                res = arm.coast(motors, enable)
-                resp = {"ok": True, "data": res}
-                idem_store(self, resp)
-                return json_response(self, resp)
-
-            if path == "/v1/arm/pickplace":
-                location = body.get("location", "center")
-                action = body.get("action")
-                speed = int(body.get("speed", 60))
-                async_exec = bool(body.get("async_exec", True))
-                if action not in {"pick", "place"}:
-                    return json_response(self, {"ok": False, "error": {"code": "BAD_PICKPLACE", "message": "action must be 'pick' or 'place'"}}, 400)
-                if async_exec:
-                    op = {
-                        "id": str(uuid.uuid4()),
-                        "type": "pickplace",
-                        "status": "queued",
-                        "submitted_at": time.time(),
-                        "request": body,
-                    }
-                    with ops_lock:
-                        ops[op["id"]] = op
-                    op_queue.put(op)
-                    resp = {"ok": True, "data": {"operation_id": op["id"], "status": op["status"]}}
-                    idem_store(self, resp)
-                    return json_response(self, resp)
-                res = arm.pickplace(location, action, speed)
-                resp = {"ok": True, "data": res}
-                idem_store(self, resp)
-                return json_response(self, resp)
-
-            if path == "/v1/arm/rotation":
-                vals = body.get("rotation") if isinstance(body, dict) else None
-                if vals is None:
-                    vals = body
-                if not isinstance(vals, dict):
-                    return json_response(self, {"ok": False, "error": {"code": "BAD_ROTATION", "message": "Provide rotation map"}}, 400)
-                res = arm.set_rotation(vals)
-                resp = {"ok": True, "data": res}
-                idem_store(self, resp)
-                return json_response(self, resp)
-
-            if path == "/v1/arm/calibration":
-                if body.get("reset"):
-                    res = arm.reset_calibration()
-                    resp = {"ok": True, "data": res}
-                    idem_store(self, resp)
-                    return json_response(self, resp)
-                if body.get("finalize"):
-                    try:
-                        res = arm.finalize_calibration()
-                        resp = {"ok": True, "data": res}
-                        idem_store(self, resp)
-                        return json_response(self, resp)
-                    except Exception as e:
-                        return json_response(self, {"ok": False, "error": {"code": "CALIB_ERROR", "message": str(e)}}, 400)
-                if body.get("joint") and body.get("name"):
-                    res = arm.record_named_point(str(body["joint"]), str(body["name"]))
-                    resp = {"ok": True, "data": res}
-                    idem_store(self, resp)
-                    return json_response(self, resp)
-                return json_response(
-                    self,
-                    {
-                        "ok": False,
-                        "error": {"code": "BAD_CALIB", "message": "Provide joint/name or finalize"},
-                    },
-                    400,
-                )
-
-            if path == "/v1/arm/recover":
-                speed = int(body.get("speed", 30))
-                timeout_s = body.get("timeout_s", 90.0)
-                res = arm.recover_to_home(speed=speed, timeout_s=timeout_s)
-                resp = {"ok": True, "data": res}
-                idem_store(self, resp)
-                return json_response(self, resp)
-
-            return json_response(self, {"ok": False, "error": {"code": "NOT_FOUND", "message": "Unknown path"}}, 404)
+            return route(self, body)
         except RuntimeError as e:
             if str(e) == "BUSY":
-                return json_response(self, {"ok": False, "error": {"code": "BUSY", "message": "Arm is executing another command"}}, 423)
+                return error_response(self, "BUSY", "Arm is executing another command", 423)
             raise
         except TimeoutError as te:
             logger.error("Timeout handling POST %s: %s", path, te)
             return json_response(self, {"ok": False, "error": {"code": "TIMEOUT", "message": str(te)}}, 408)
         except Exception:
             logger.exception("Error handling POST %s", path)
-            return json_response(self, {"ok": False, "error": {"code": "SERVER_ERROR", "message": "Internal server error"}}, 500)
+            return error_response(self, "SERVER_ERROR", "Internal server error", 500)
 
 # ---------------------------
 # Entrypoint
@@ -1338,6 +2263,16 @@ class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
     daemon_threads = True
     allow_reuse_address = True
 
+    def server_activate(self):
+        super().server_activate()
+        # Only this many connections may stay open between requests; see
+        # ``Handler.handle``. Every connection still gets its own thread, so
+        # a new request (e.g. stop) never waits behind idle sockets.
+        self.keepalive_slots = threading.BoundedSemaphore(HTTP_MAX_KEEPALIVE)
+        # Caps requests being handled at once; taken in ``do_GET``/``do_POST``
+        # after the request line is read, so idle connections hold no slot.
+        self.request_slots = threading.BoundedSemaphore(HTTP_MAX_WORKERS)
+
 
 class DualStackThreadingHTTPServer(ThreadingHTTPServer):
     address_family = socket.AF_INET6
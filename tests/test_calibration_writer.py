@@ -0,0 +1,51 @@
+import json
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault("USE_FAKE_MOTORS", "1")
+
+from lego_arm_master import ArmController  # noqa: E402
+
+
+class CalibrationWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.arm = ArmController(calib_path=os.path.join(self.tmpdir.name, "arm_calibration.json"))
+        self.arm.flush_calibration()
+
+    def test_flush_writes_latest_snapshot(self):
+        self.arm.rotation_deg["B"] = 400.0
+        self.arm.save_calibration()
+        self.arm.points["B"]["min"] = -12.5
+        self.arm.save_calibration()
+        self.arm.flush_calibration()
+        with open(self.arm._calib_path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(data["rotation"]["B"], 400.0)
+        self.assertEqual(data["points"]["B"], {"min": -12.5})
+
+    def test_snapshot_is_isolated_from_later_changes(self):
+        self.arm.points["C"]["max"] = 10.0
+        self.arm.save_calibration()
+        self.arm.points["C"]["max"] = 99.0
+        self.arm.flush_calibration()
+        with open(self.arm._calib_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["points"]["C"], {"max": 10.0})
+
+    def test_unchanged_snapshot_is_not_rewritten(self):
+        self.arm.save_calibration()
+        self.arm.flush_calibration()
+        os.remove(self.arm._calib_path)
+        self.arm.save_calibration()
+        self.arm.flush_calibration()
+        self.assertFalse(os.path.exists(self.arm._calib_path))
+        self.arm.rotation_deg["A"] = 380.0
+        self.arm.save_calibration()
+        self.arm.flush_calibration()
+        self.assertTrue(os.path.exists(self.arm._calib_path))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,54 @@
+import logging
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault("USE_FAKE_MOTORS", "1")
+
+from lego_arm_master import _LogFileHandler  # noqa: E402
+
+
+class LogFileHandlerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "arm.log")
+
+    def _logger(self, handler):
+        log = logging.getLogger(f"test-log-handler-{id(handler)}")
+        log.propagate = False
+        log.setLevel(logging.INFO)
+        log.addHandler(handler)
+        self.addCleanup(handler.close)
+        self.addCleanup(log.removeHandler, handler)
+        return log
+
+    def test_info_records_stay_buffered_until_flush(self):
+        handler = _LogFileHandler(self.path, maxBytes=1_000_000, backupCount=1)
+        log = self._logger(handler)
+        for i in range(5):
+            log.info("record %d", i)
+            self.assertEqual(os.path.getsize(self.path), 0)
+        handler.flush()
+        self.assertGreater(os.path.getsize(self.path), 0)
+
+    def test_warnings_are_written_through(self):
+        handler = _LogFileHandler(self.path, maxBytes=1_000_000, backupCount=1)
+        log = self._logger(handler)
+        log.info("buffered")
+        log.warning("urgent")
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(f.read().splitlines(), ["buffered", "urgent"])
+
+    def test_rolls_over_on_the_running_size(self):
+        handler = _LogFileHandler(self.path, maxBytes=100, backupCount=2)
+        log = self._logger(handler)
+        for i in range(20):
+            log.info("record %02d %s", i, "x" * 20)
+        handler.flush()
+        self.assertTrue(os.path.exists(self.path + ".1"))
+        self.assertLessEqual(os.path.getsize(self.path + ".1"), 100 + 40)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
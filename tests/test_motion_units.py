@@ -1,8 +1,14 @@
+import json
 import os
+import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
 
 os.environ.setdefault("USE_FAKE_MOTORS", "1")
 
+import lego_arm_master  # noqa: E402
 from lego_arm_master import ArmController  # noqa: E402
 
 
@@ -34,9 +40,54 @@ class DriftMotor:
         pass
 
 
+class RendezvousMotor(DriftMotor):
+    """Motor stub whose move only completes once its peer is moving too."""
+
+    def __init__(self, port: str, barrier: threading.Barrier):
+        super().__init__(port)
+        self._barrier = barrier
+
+    def run_for_degrees(self, degrees: float, speed: int = 50, blocking: bool = True):
+        self._barrier.wait()
+        self._pos += degrees
+
+
+class StallingMotor(DriftMotor):
+    """Motor stub whose move blocks until ``stop`` is called."""
+
+    def __init__(self, port: str):
+        super().__init__(port)
+        self.stopped = threading.Event()
+        self.returned = threading.Event()
+
+    def run_for_degrees(self, degrees: float, speed: int = 50, blocking: bool = True):
+        self.stopped.wait(5.0)
+        # Real motors take a moment to wind down after a stop.
+        time.sleep(0.1)
+        self.returned.set()
+
+    def stop(self):
+        self.stopped.set()
+
+
+class StuckMotor(StallingMotor):
+    """Stalling stub that ignores ``stop`` until the test releases it."""
+
+    def __init__(self, port: str):
+        super().__init__(port)
+        self.release = threading.Event()
+
+    def run_for_degrees(self, degrees: float, speed: int = 50, blocking: bool = True):
+        self.release.wait(5.0)
+        self.returned.set()
+
+
 class MotionUnitTests(unittest.TestCase):
     def setUp(self):
-        self.arm = ArmController()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.arm = ArmController(calib_path=os.path.join(tmpdir.name, "arm_calibration.json"))
+        self.addCleanup(self.arm.flush_calibration)
         # Reset fake motor positions between tests for determinism.
         for name, motor in self.arm.motors.items():
             if hasattr(motor, "_pos"):
@@ -87,6 +138,13 @@ class MotionUnitTests(unittest.TestCase):
         )
         self.assertAlmostEqual(self.arm.current_abs["A"] - start, 3010.0, delta=0.1)
 
+    def test_non_finite_targets_are_refused(self):
+        self.arm.limits["B"] = (-90.0, 90.0)
+        for value in (float("nan"), float("inf")):
+            with self.assertRaises(ValueError):
+                self.arm.move("absolute", {"B": value}, speed=60, units="degrees")
+        self.assertEqual(self.arm.current_abs["B"], 0.0)
+
     def test_finalize_corrects_encoder_error(self):
         drift = DriftMotor("A")
         self.arm.motors["A"] = drift
@@ -105,6 +163,119 @@ class MotionUnitTests(unittest.TestCase):
         self.assertAlmostEqual(self.arm.current_abs["A"], 90.0, delta=1.0)
         self.assertAlmostEqual(result["finalize_corrections"]["A"], summary["finalize_corrections"]["A"])
 
+    def test_multi_joint_move_drives_joints_concurrently(self):
+        barrier = threading.Barrier(2, timeout=2.0)
+        for joint in ("B", "C"):
+            self.arm.motors[joint] = RendezvousMotor(joint, barrier)
+            self.arm.current_abs[joint] = 0.0
+        self.arm.move(
+            "relative",
+            {"B": 45, "C": -30},
+            speed=60,
+            units="degrees",
+            finalize=False,
+        )
+        self.assertAlmostEqual(self.arm.current_abs["B"], 45.0, delta=0.1)
+        self.assertAlmostEqual(self.arm.current_abs["C"], -30.0, delta=0.1)
+
+    def test_timeout_fires_while_a_joint_is_still_moving(self):
+        motor = StallingMotor("B")
+        self.arm.motors["B"] = motor
+        with self.assertRaises(TimeoutError):
+            self.arm.move("relative", {"B": 45}, speed=60, units="degrees", timeout_s=0.2)
+        self.assertTrue(motor.stopped.is_set())
+        self.assertTrue(motor.returned.is_set())
+        self.assertEqual(self.arm.current_abs["B"], 0.0)
+        self.assertFalse(self.arm.stop_event.is_set())
+        # A follow-up move must not inherit the stop request or queue behind
+        # the timed-out job.
+        follow_up = DriftMotor("B")
+        self.arm.motors["B"] = follow_up
+        result = self.arm.move("relative", {"B": 10}, speed=60, units="degrees", timeout_s=2.0)
+        self.assertFalse(result["timeout"])
+        self.assertGreater(follow_up.get_degrees(), 0.0)
+        self.assertEqual(self.arm.current_abs["B"], follow_up.get_degrees())
+
+    def test_timeout_gives_up_on_a_driver_that_ignores_stop(self):
+        motor = StuckMotor("B")
+        self.arm.motors["B"] = motor
+        self.addCleanup(motor.release.set)
+        start = time.monotonic()
+        with mock.patch.object(lego_arm_master, "STOP_DRAIN_TIMEOUT_S", 0.3), \
+                self.assertLogs(lego_arm_master.logger, "WARNING"):
+            with self.assertRaises(TimeoutError):
+                self.arm.move("relative", {"B": 45}, speed=60, units="degrees", timeout_s=0.2)
+        self.assertLess(time.monotonic() - start, 2.0)
+        self.assertTrue(motor.stopped.is_set())
+        self.assertFalse(motor.returned.is_set())
+        self.assertFalse(self.arm.stop_event.is_set())
+        self.assertTrue(self.arm._acquire_busy())
+        self.arm._release_busy()
+
+    def test_move_nowait_defers_capped_deltas_while_busy(self):
+        held, release = threading.Event(), threading.Event()
+
+        def hold_arm():
+            self.arm._acquire_busy()
+            held.set()
+            release.wait(2.0)
+            self.arm._release_busy()
+
+        holder = threading.Thread(target=hold_arm)
+        holder.start()
+        held.wait(2.0)
+        self.assertIsNone(self.arm.move_nowait({"B": 10.0}))
+        self.assertIsNone(self.arm.move_nowait({"B": 10.0}))
+        release.set()
+        holder.join()
+        self.arm.move_nowait({"C": 1.0})
+        self.assertAlmostEqual(self.arm.current_abs["B"], 15.0, delta=0.1)
+        self.assertAlmostEqual(self.arm.current_abs["C"], 1.0, delta=0.1)
+
+    def test_state_changes_are_refused_while_a_move_is_in_flight(self):
+        self.arm.points["C"]["max"] = 10.0
+        self.arm.limits["C"] = (-10.0, 10.0)
+        held, release = threading.Event(), threading.Event()
+
+        def hold_arm():
+            self.arm._acquire_busy()
+            held.set()
+            release.wait(2.0)
+            self.arm._release_busy()
+
+        holder = threading.Thread(target=hold_arm)
+        holder.start()
+        held.wait(2.0)
+        try:
+            for call in (
+                lambda: self.arm.record_named_point("B", "min"),
+                lambda: self.arm.coast(["B"], True),
+                lambda: self.arm.set_rotation({"B": 400}),
+                self.arm.reset_calibration,
+            ):
+                with self.assertRaisesRegex(RuntimeError, "BUSY"):
+                    call()
+        finally:
+            release.set()
+            holder.join()
+        self.assertNotIn("min", self.arm.points["B"])
+        self.assertEqual(self.arm.points["C"], {"max": 10.0})
+        self.assertEqual(self.arm.limits["C"], (-10.0, 10.0))
+        self.arm.record_named_point("B", "min")
+        self.assertIn("min", self.arm.points["B"])
+        self.arm.reset_calibration()
+        self.assertEqual(self.arm.points["C"], {})
+
+    def test_state_body_is_cached_until_the_arm_changes(self):
+        first = self.arm.state_body()
+        self.assertIs(self.arm.state_body(), first)
+        self.arm.move("relative", {"B": 20}, speed=60, units="degrees", finalize=False)
+        data = json.loads(self.arm.state_body())["data"]
+        self.assertAlmostEqual(data["abs_degrees"]["B"], 20.0, delta=0.1)
+
+    def test_state_lists_motors(self):
+        self.assertEqual(self.arm.state()["motors"], ["A", "B", "C", "D"])
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
@@ -0,0 +1,80 @@
+import os
+import queue
+import threading
+import unittest
+from unittest import mock
+
+os.environ.setdefault("USE_FAKE_MOTORS", "1")
+
+import lego_arm_master  # noqa: E402
+from lego_arm_master import _admit_op, _coalesce, _drain, _merged_request, _run_ops  # noqa: E402
+
+
+def _move(op_id, joints, **extra):
+    req = {"mode": "relative", "joints": joints, "speed": 60, "units": "degrees"}
+    req.update(extra)
+    return {"id": op_id, "type": "move", "status": "queued", "request": req}
+
+
+class OpBatchingTests(unittest.TestCase):
+    def test_consecutive_relative_moves_are_merged(self):
+        batch = [_move("1", {"A": 10}), _move("2", {"A": 5, "B": -3})]
+        groups = _coalesce(batch)
+        self.assertEqual([[op["id"] for op in g] for g in groups], [["1", "2"]])
+        self.assertEqual(_merged_request(groups[0])["joints"], {"A": 15.0, "B": -3.0})
+
+    def test_incompatible_ops_stay_separate(self):
+        batch = [
+            _move("1", {"A": 10}),
+            _move("2", {"A": 10}, speed=30),
+            _move("3", {"A": "open"}),
+            {"id": "4", "type": "pose", "status": "queued", "request": {"name": "home"}},
+            _move("5", {"A": 10}, mode="absolute"),
+        ]
+        groups = _coalesce(batch)
+        self.assertEqual([len(g) for g in groups], [1, 1, 1, 1, 1])
+
+    def test_non_numeric_joint_values_are_never_merged(self):
+        batch = [_move("1", {"A": 10}), _move("2", {"A": None}), _move("3", {"A": 5})]
+        groups = _coalesce(batch)
+        self.assertEqual([[op["id"] for op in g] for g in groups], [["1"], ["2"], ["3"]])
+
+    def test_rejected_merged_group_only_fails_the_bad_op(self):
+        group = [_move("bad-1", {"A": 10}), _move("bad-2", {"Z": 5})]
+        _run_ops(group)
+        self.assertEqual(lego_arm_master.ops.get("bad-1")["status"], "succeeded")
+        self.assertEqual(lego_arm_master.ops.get("bad-2")["status"], "failed")
+
+    def test_unbuildable_merged_group_fails_without_raising(self):
+        group = [_move("null-1", {"A": 10}), _move("null-2", {"A": None})]
+        _run_ops(group)
+        self.assertEqual(lego_arm_master.ops.get("null-1")["status"], "succeeded")
+        self.assertEqual(lego_arm_master.ops.get("null-2")["status"], "failed")
+
+    def test_drain_stops_at_shutdown_sentinel(self):
+        q = queue.SimpleQueue()
+        for item in (_move("1", {"A": 1}), None, _move("2", {"A": 1})):
+            q.put(item)
+        batch = _drain(q)
+        self.assertEqual(len(batch), 2)
+        self.assertIsNone(batch[-1])
+        self.assertEqual(_coalesce(batch)[-1], [None])
+
+    def test_admission_rejects_when_queue_is_full(self):
+        with mock.patch.object(lego_arm_master, "_op_slots", threading.BoundedSemaphore(1)):
+            self.assertTrue(_admit_op())
+            self.assertFalse(_admit_op())
+            lego_arm_master._op_slots.release()
+            self.assertTrue(_admit_op())
+
+    def test_finished_records_do_not_block_admission(self):
+        store = lego_arm_master.TTLCache(ttl=60, maxsize=2)
+        store["done-1"] = {"status": "succeeded"}
+        store["done-2"] = {"status": "failed"}
+        with mock.patch.object(lego_arm_master, "ops", store), \
+                mock.patch.object(lego_arm_master, "_op_slots", threading.BoundedSemaphore(1)):
+            self.assertTrue(_admit_op())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import unittest
+from unittest import mock
+
+os.environ.setdefault("USE_FAKE_MOTORS", "1")
+
+import lego_arm_master  # noqa: E402
+from lego_arm_master import TTLCache  # noqa: E402
+
+
+class TTLCacheTests(unittest.TestCase):
+    def test_entries_expire_after_ttl(self):
+        cache = TTLCache(ttl=10)
+        with mock.patch.object(lego_arm_master.time, "monotonic", return_value=100.0):
+            cache["a"] = 1
+        with mock.patch.object(lego_arm_master.time, "monotonic", return_value=105.0):
+            self.assertEqual(cache.get("a"), 1)
+        with mock.patch.object(lego_arm_master.time, "monotonic", return_value=111.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_expire_sweeps_oldest_first(self):
+        cache = TTLCache(ttl=10)
+        for i, t in enumerate((100.0, 104.0, 108.0)):
+            with mock.patch.object(lego_arm_master.time, "monotonic", return_value=t):
+                cache[str(i)] = i
+        with mock.patch.object(lego_arm_master.time, "monotonic", return_value=115.0):
+            self.assertEqual(cache.expire(), 2)
+            self.assertEqual(len(cache), 1)
+            self.assertEqual(cache.get("2"), 2)
+
+    def test_per_key_ttl_overrides_default(self):
+        cache = TTLCache(ttl=10)
+        with mock.patch.object(lego_arm_master.time, "monotonic", return_value=100.0):
+            cache.set("long", 1, ttl=60)
+            cache["short"] = 2
+        with mock.patch.object(lego_arm_master.time, "monotonic", return_value=120.0):
+            self.assertEqual(cache.expire(), 1)
+            self.assertEqual(cache.get("long"), 1)
+            self.assertIsNone(cache.get("short"))
+
+    def test_overwrite_extends_expiry(self):
+        cache = TTLCache(ttl=10)
+        with mock.patch.object(lego_arm_master.time, "monotonic", return_value=100.0):
+            cache["a"] = 1
+        with mock.patch.object(lego_arm_master.time, "monotonic", return_value=108.0):
+            cache["a"] = 2
+        with mock.patch.object(lego_arm_master.time, "monotonic", return_value=112.0):
+            self.assertEqual(cache.expire(), 0)
+            self.assertEqual(cache.get("a"), 2)
+
+    def test_maxsize_evicts_oldest(self):
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        cache["c"] = 3
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_maxsize_evicts_least_recently_used(self):
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        self.assertEqual(cache.get("a"), 1)
+        cache["c"] = 3
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()